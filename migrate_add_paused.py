@@ -1,11 +1,41 @@
 #!/usr/bin/env python3
 """
-Migration script to add is_paused column to Monitor table
+Migration script to add is_paused column to Monitor table,
+the remaining columns of the consolidated Monitor/Snapshot schema,
+the composite snapshot indexes, binary content hashes, and the
+denormalized monitor.last_content_hash / last_raw_hash, and the
+next_check_at scheduling column
 """
 
+import hashlib
 import sqlite3
 import os
 
+
+# Columns added when models.py and models_enhanced.py were merged
+CONSOLIDATED_COLUMNS = [
+    ("monitor", "custom_headers", "TEXT"),
+    ("monitor", "last_changed", "DATETIME"),
+    ("monitor", "notification_enabled", "BOOLEAN DEFAULT 1"),
+    ("monitor", "monitor_style", "VARCHAR(20) DEFAULT 'lines'"),
+    ("monitor", "ignore_whitespace", "BOOLEAN DEFAULT 1"),
+    ("monitor", "ignore_case", "BOOLEAN DEFAULT 0"),
+    ("monitor", "trigger_threshold", "INTEGER DEFAULT 1"),
+    ("monitor", "total_checks", "INTEGER DEFAULT 0"),
+    ("monitor", "total_changes", "INTEGER DEFAULT 0"),
+    ("monitor", "consecutive_failures", "INTEGER DEFAULT 0"),
+    ("snapshot", "content_raw", "TEXT"),
+    ("snapshot", "change_count", "INTEGER DEFAULT 0"),
+    ("snapshot", "diff_html", "TEXT"),
+    ("snapshot", "response_time_ms", "INTEGER"),
+    ("snapshot", "status_code", "INTEGER"),
+]
+
+def column_exists(cursor, table: str, column: str) -> bool:
+    cursor.execute(f"SELECT 1 FROM pragma_table_info('{table}') WHERE name=? LIMIT 1", (column,))
+    return cursor.fetchone() is not None
+
+
 def migrate_database():
     db_path = "instance/ripplememento.db"
     if not os.path.exists(db_path):
@@ -16,21 +46,90 @@ def migrate_database():
     cursor = conn.cursor()
     
     try:
-        # Check if is_paused column already exists
-        cursor.execute("PRAGMA table_info(monitor)")
-        columns = [column[1] for column in cursor.fetchall()]
+        # `with conn` commits on success and rolls back on error
+        with conn:
+            if not column_exists(cursor, "monitor", "is_paused"):
+                print("Adding is_paused column to monitor table...")
+                cursor.execute("ALTER TABLE monitor ADD COLUMN is_paused BOOLEAN DEFAULT 0")
+                print("✅ Migration completed successfully!")
+            else:
+                print("✅ is_paused column already exists, no migration needed.")
+        
+        with conn:
+            for table, column, ddl in CONSOLIDATED_COLUMNS:
+                if not column_exists(cursor, table, column):
+                    print(f"Adding {column} column to {table} table...")
+                    cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+            # Enhanced-schema databases stored headers in a `headers` column
+            if column_exists(cursor, "monitor", "headers"):
+                cursor.execute("UPDATE monitor SET custom_headers = headers WHERE custom_headers IS NULL")
+        
+        with conn:
+            # Composite indexes for the per-monitor snapshot lookups
+            print("Ensuring snapshot indexes exist...")
+            cursor.execute("CREATE INDEX IF NOT EXISTS ix_snap_monitor_created ON snapshot (monitor_id, created_at)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS ix_snap_monitor_id ON snapshot (monitor_id, id)")
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS ix_snap_monitor_id_hashed ON snapshot (monitor_id, id) "
+                "WHERE content_hash IS NOT NULL"
+            )
+            cursor.execute("ANALYZE snapshot")
+            print("✅ Snapshot indexes are up to date.")
+        
+        with conn:
+            # Hashes used to be stored as hex text (MD5 in the basic service,
+            # SHA-256 in the enhanced one); recompute each from the stored text
+            # as the raw 128-bit BLAKE2b digest that checks now compare against
+            rows = cursor.execute(
+                "SELECT id, content_text FROM snapshot WHERE typeof(content_hash) = 'text'"
+            ).fetchall()
+            rehashed = bool(rows)
+            if rows:
+                print(f"Rehashing {len(rows)} legacy hex content hashes as BLAKE2b...")
+                cursor.executemany(
+                    "UPDATE snapshot SET content_hash = ? WHERE id = ?",
+                    [
+                        (hashlib.blake2b((content_text or "").encode("utf-8"), digest_size=16).digest(), snapshot_id)
+                        for snapshot_id, content_text in rows
+                    ],
+                )
+                cursor.execute("REINDEX snapshot")
+        
+        with conn:
+            # Change detection reads the newest snapshot's hash off the monitor row
+            if not column_exists(cursor, "monitor", "last_content_hash"):
+                print("Adding last_content_hash column to monitor table...")
+                cursor.execute("ALTER TABLE monitor ADD COLUMN last_content_hash BLOB")
+            # Backfill new columns, and refresh every copy once snapshots were rehashed
+            cursor.execute(
+                "UPDATE monitor SET last_content_hash = ("
+                "SELECT content_hash FROM snapshot WHERE snapshot.monitor_id = monitor.id "
+                "ORDER BY created_at DESC LIMIT 1)"
+                + ("" if rehashed else " WHERE last_content_hash IS NULL")
+            )
+            if not column_exists(cursor, "monitor", "last_raw_hash"):
+                print("Adding last_raw_hash column to monitor table...")
+                cursor.execute("ALTER TABLE monitor ADD COLUMN last_raw_hash BLOB")
+        
+        with conn:
+            # The scheduler selects due monitors by next_check_at instead of scanning them all
+            if not column_exists(cursor, "monitor", "next_check_at"):
+                print("Adding next_check_at column to monitor table...")
+                cursor.execute("ALTER TABLE monitor ADD COLUMN next_check_at DATETIME")
+                cursor.execute(
+                    "UPDATE monitor SET next_check_at = "
+                    "datetime(last_checked, '+' || COALESCE(interval_minutes, 30) || ' minutes') "
+                    "WHERE last_checked IS NOT NULL"
+                )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS ix_monitor_active_next_check ON monitor (active, next_check_at)"
+            )
         
-        if 'is_paused' not in columns:
-            print("Adding is_paused column to monitor table...")
-            cursor.execute("ALTER TABLE monitor ADD COLUMN is_paused BOOLEAN DEFAULT 0")
-            conn.commit()
-            print("✅ Migration completed successfully!")
-        else:
-            print("✅ is_paused column already exists, no migration needed.")
+        # Refresh planner statistics for the altered schema
+        cursor.execute("PRAGMA optimize")
             
     except Exception as e:
         print(f"❌ Migration failed: {e}")
-        conn.rollback()
     finally:
         conn.close()
 
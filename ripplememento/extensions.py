@@ -1,4 +1,39 @@
+import sqlite3
+import threading
+from typing import Optional
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.exc import OperationalError
 
 
 db = SQLAlchemy()
+
+_DATA_VERSION_LOCK = threading.Lock()
+_data_version_conn = None
+
+
+def sqlite_data_version() -> Optional[int]:
+    """Return PRAGMA data_version as seen by a dedicated long-lived connection.
+
+    data_version is per-connection and only changes when *another*
+    connection commits, so it must be read from a connection that outlives
+    requests (the engine itself opens one per checkout). Returns None when
+    the database is not a SQLite file.
+    """
+    global _data_version_conn
+    database = db.engine.url.database
+    if db.engine.dialect.name != "sqlite" or database in (None, "", ":memory:"):
+        return None
+    with _DATA_VERSION_LOCK:
+        if _data_version_conn is None:
+            _data_version_conn = sqlite3.connect(database, check_same_thread=False)
+        return _data_version_conn.execute("PRAGMA data_version").fetchone()[0]
+
+
+def optimize_sqlite(engine):
+    """Run PRAGMA optimize, which re-analyzes only the tables whose statistics look stale"""
+    try:
+        with engine.connect() as conn:
+            conn.exec_driver_sql("PRAGMA optimize")
+    except OperationalError:
+        # Best effort: stale statistics only cost plan quality, never correctness
+        pass
@@ -1,36 +1,89 @@
-from datetime import datetime
+import random
+from datetime import datetime, timedelta
+import orjson
+from sqlalchemy.ext.hybrid import hybrid_property
 from .extensions import db
 
 
 class Monitor(db.Model):
+    __tablename__ = "monitor"
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
     url = db.Column(db.String(2048), nullable=False, unique=False)
     css_selector = db.Column(db.String(512), nullable=True)
-    headers = db.Column(db.Text, nullable=True)  # JSON string
+    custom_headers = db.Column(db.Text, nullable=True)  # JSON string for headers
+    headers = db.synonym("custom_headers")
     ignore_text = db.Column(db.Text, nullable=True)  # Text to ignore in diffs
     trigger_text = db.Column(db.Text, nullable=True)  # Only trigger on this text
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_checked = db.Column(db.DateTime, nullable=True)
+    next_check_at = db.Column(db.DateTime, nullable=True)  # NULL: due at the next scheduler tick
     last_changed = db.Column(db.DateTime, nullable=True)
+    last_content_hash = db.Column(db.LargeBinary(32), nullable=True)  # content_hash of the newest snapshot
+    last_raw_hash = db.Column(db.LargeBinary(16), nullable=True)  # page_fingerprint of the last successful fetch
     interval_minutes = db.Column(db.Integer, default=30)
     active = db.Column(db.Boolean, default=True)
+    is_paused = db.Column(db.Boolean, default=False)
     notification_enabled = db.Column(db.Boolean, default=True)
     
+    # Monitoring style options
+    monitor_style = db.Column(db.String(20), default='lines')  # words, lines, chars, json
+    ignore_whitespace = db.Column(db.Boolean, default=True)
+    ignore_case = db.Column(db.Boolean, default=False)
+    trigger_threshold = db.Column(db.Integer, default=1)  # minimum changes to trigger
+    
     # Stats
     total_checks = db.Column(db.Integer, default=0)
     total_changes = db.Column(db.Integer, default=0)
     consecutive_failures = db.Column(db.Integer, default=0)
     
-    # Relations
+    __table_args__ = (
+        db.Index("ix_monitor_active_next_check", "active", "next_check_at"),
+    )
+    
+    # Relations (lazy by default; queries that walk them opt in to eager loading)
     snapshots = db.relationship(
-        "Snapshot", backref="monitor", lazy=True, cascade="all, delete-orphan"
+        "Snapshot",
+        back_populates="monitor",
+        lazy="select",
+        cascade="all, delete-orphan",
+        order_by="Snapshot.created_at.desc()",
     )
     tags = db.relationship(
-        "Tag", secondary="monitor_tags", back_populates="monitors"
+        "Tag", secondary="monitor_tags", back_populates="monitors", lazy="select"
     )
 
     @property
+    def headers_dict(self) -> dict:
+        """custom_headers decoded, reparsed only when the stored JSON changes"""
+        raw = self.custom_headers
+        cached = self.__dict__.get("_headers_cache")
+        if cached is None or cached[0] != raw:
+            try:
+                parsed = orjson.loads(raw) if raw else {}
+            except orjson.JSONDecodeError:
+                parsed = {}
+            cached = self._headers_cache = (raw, parsed if isinstance(parsed, dict) else {})
+        return cached[1]
+
+    def mark_checked(self):
+        """Stamp last_checked and schedule the next check one interval later.
+
+        A few seconds of jitter keep monitors created together from staying
+        in lockstep on every later tick.
+        """
+        now = datetime.utcnow()
+        interval = self.interval_minutes or 30
+        self.last_checked = now
+        self.next_check_at = now + timedelta(minutes=interval, seconds=random.uniform(0, min(30, interval * 6)))
+
+    def reschedule(self):
+        """Recompute next_check_at after interval_minutes changes"""
+        if self.last_checked is not None:
+            self.next_check_at = self.last_checked + timedelta(minutes=self.interval_minutes or 30)
+
+    @hybrid_property
     def status(self):
         if not self.active:
             return "paused"
@@ -40,17 +93,49 @@ class Monitor(db.Model):
             return "stale"
         return "active"
 
+    @status.expression
+    def status(cls):
+        # SQL mirror of the Python property so status filters run in the database
+        minutes_since_check = (db.func.julianday("now") - db.func.julianday(cls.last_checked)) * 1440
+        return db.case(
+            (db.func.coalesce(cls.active, False).is_(False), "paused"),
+            (cls.consecutive_failures > 3, "error"),
+            (db.and_(cls.last_checked.isnot(None), minutes_since_check > cls.interval_minutes * 2), "stale"),
+            else_="active",
+        )
+
 
 class Snapshot(db.Model):
+    __tablename__ = "snapshot"
+    __table_args__ = (
+        db.Index("ix_snap_monitor_created", "monitor_id", "created_at"),
+        db.Index("ix_snap_monitor_id", "monitor_id", "id"),
+        # Partial index: the newest earlier non-error snapshot is its first entry
+        db.Index(
+            "ix_snap_monitor_id_hashed", "monitor_id", "id",
+            sqlite_where=db.text("content_hash IS NOT NULL"),
+        ),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     monitor_id = db.Column(db.Integer, db.ForeignKey("monitor.id"), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    content_hash = db.Column(db.String(64), index=True)
+    content_hash = db.Column(db.LargeBinary(32), index=True)  # Raw digest bytes
     content_text = db.Column(db.Text)
+    content_raw = db.Column(db.Text)  # Store raw content for different processing styles
+    change_count = db.Column(db.Integer, default=0)  # Number of changes detected
+    diff_html = db.Column(db.Text, nullable=True)  # Precomputed diff HTML
     error_message = db.Column(db.Text, nullable=True)
     response_time_ms = db.Column(db.Integer, nullable=True)
     status_code = db.Column(db.Integer, nullable=True)
 
+    monitor = db.relationship("Monitor", back_populates="snapshots", lazy="select")
+
+    @property
+    def content_hash_hex(self) -> str:
+        """Hex form of content_hash for display"""
+        return self.content_hash.hex() if self.content_hash else ""
+
 
 class Tag(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -59,7 +144,7 @@ class Tag(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     monitors = db.relationship(
-        "Monitor", secondary="monitor_tags", back_populates="tags"
+        "Monitor", secondary="monitor_tags", back_populates="tags", lazy="select"
     )
 
 
@@ -75,7 +160,7 @@ class NotificationEndpoint(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
     type = db.Column(db.String(50), nullable=False)  # email, webhook, discord, slack
-    config = db.Column(db.Text, nullable=False)  # JSON config
+    config = db.Column(db.JSON, nullable=False)  # Decoded once by SQLAlchemy on load
     active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
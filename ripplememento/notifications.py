@@ -1,37 +1,65 @@
-import json
+import atexit
 import smtplib
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from types import SimpleNamespace
 from typing import Dict, Any, Optional
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 from .extensions import db
 from .models_enhanced import NotificationEndpoint, MonitorHistory
 
 
+# Shared keep-alive pool so webhook/Discord/Slack posts reuse TLS connections
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
 class NotificationService:
     def __init__(self):
-        pass
+        # SMTP clients keyed by (host, port, username), reused across sends
+        self._smtp = {}
+        self._smtp_lock = threading.Lock()
+        atexit.register(self.close)
 
     def send_notification(self, monitor, snapshot, notification_type="change"):
         """Send notifications for a monitor change/error"""
         endpoints = NotificationEndpoint.query.filter_by(active=True).all()
+        if not endpoints:
+            return
         
-        for endpoint in endpoints:
-            try:
-                config = json.loads(endpoint.config)
+        # Plain copies so the worker threads never touch the scoped session
+        monitor = SimpleNamespace(id=monitor.id, name=monitor.name, url=monitor.url)
+        if snapshot is not None:
+            snapshot = SimpleNamespace(id=snapshot.id, error_message=snapshot.error_message)
+        
+        with ThreadPoolExecutor(max_workers=min(8, len(endpoints))) as executor:
+            for endpoint in endpoints:
+                executor.submit(
+                    self._dispatch, endpoint.name, endpoint.type, endpoint.config,
+                    monitor, snapshot, notification_type
+                )
+
+    def _dispatch(self, name: str, endpoint_type: str, config: Dict[str, Any], monitor, snapshot, notification_type: str):
+        try:
+            if endpoint_type == "email":
+                self._send_email(monitor, snapshot, config, notification_type)
+            elif endpoint_type == "webhook":
+                self._send_webhook(monitor, snapshot, config, notification_type)
+            elif endpoint_type == "discord":
+                self._send_discord(monitor, snapshot, config, notification_type)
+            elif endpoint_type == "slack":
+                self._send_slack(monitor, snapshot, config, notification_type)
                 
-                if endpoint.type == "email":
-                    self._send_email(monitor, snapshot, config, notification_type)
-                elif endpoint.type == "webhook":
-                    self._send_webhook(monitor, snapshot, config, notification_type)
-                elif endpoint.type == "discord":
-                    self._send_discord(monitor, snapshot, config, notification_type)
-                elif endpoint.type == "slack":
-                    self._send_slack(monitor, snapshot, config, notification_type)
-                    
-            except Exception as e:
-                print(f"Failed to send notification via {endpoint.name}: {e}")
+        except Exception as e:
+            print(f"Failed to send notification via {name}: {e}")
 
     def _send_email(self, monitor, snapshot, config: Dict[str, Any], notification_type: str):
         subject = f"RippleMemento: {monitor.name} - {notification_type.title()}"
@@ -50,7 +78,7 @@ class NotificationService:
             Monitor: {monitor.name}
             URL: {monitor.url}
             
-            Error: {getattr(snapshot, 'error_message', 'Unknown error')}
+            Error: {(snapshot.error_message if snapshot else None) or 'Unknown error'}
             """
 
         msg = MIMEMultipart()
@@ -59,13 +87,37 @@ class NotificationService:
         msg['Subject'] = subject
         msg.attach(MIMEText(body, 'plain'))
 
-        server = smtplib.SMTP(config['smtp_host'], config.get('smtp_port', 587))
-        if config.get('use_tls', True):
-            server.starttls()
-        if config.get('username') and config.get('password'):
-            server.login(config['username'], config['password'])
-        server.send_message(msg)
-        server.quit()
+        with self._smtp_lock:
+            key, server = self._smtp_client(config)
+            try:
+                server.send_message(msg)
+            except (smtplib.SMTPServerDisconnected, ConnectionResetError):
+                # Cached connection went stale; reconnect once
+                self._smtp.pop(key, None)
+                key, server = self._smtp_client(config)
+                server.send_message(msg)
+
+    def _smtp_client(self, config: Dict[str, Any]):
+        key = (config['smtp_host'], config.get('smtp_port', 587), config.get('username'))
+        server = self._smtp.get(key)
+        if server is None:
+            server = smtplib.SMTP(config['smtp_host'], config.get('smtp_port', 587))
+            if config.get('use_tls', True):
+                server.starttls()
+            if config.get('username') and config.get('password'):
+                server.login(config['username'], config['password'])
+            self._smtp[key] = server
+        return key, server
+
+    def close(self):
+        """Close any cached SMTP connections"""
+        with self._smtp_lock:
+            for server in self._smtp.values():
+                try:
+                    server.quit()
+                except (smtplib.SMTPException, OSError):
+                    pass
+            self._smtp.clear()
 
     def _send_webhook(self, monitor, snapshot, config: Dict[str, Any], notification_type: str):
         payload = {
@@ -78,14 +130,14 @@ class NotificationService:
         }
         
         if notification_type == "error" and snapshot:
-            payload["error_message"] = getattr(snapshot, 'error_message', 'Unknown error')
+            payload["error_message"] = snapshot.error_message or 'Unknown error'
             
-        headers = config.get('headers', {})
+        headers = dict(config.get('headers', {}))
         headers.setdefault('Content-Type', 'application/json')
         
-        requests.post(
+        _SESSION.post(
             config['url'],
-            json=payload,
+            data=orjson.dumps(payload),
             headers=headers,
             timeout=10
         )
@@ -97,20 +149,20 @@ class NotificationService:
         else:
             color = 0xff0000  # Red
             description = f"❌ **Error** monitoring [{monitor.name}]({monitor.url})"
-            if snapshot and hasattr(snapshot, 'error_message'):
+            if snapshot and snapshot.error_message:
                 description += f"\n```{snapshot.error_message}```"
 
         embed = {
             "title": "RippleMemento Alert",
             "description": description,
             "color": color,
-            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z"),
             "footer": {"text": "RippleMemento"}
         }
 
         payload = {"embeds": [embed]}
         
-        requests.post(config['webhook_url'], json=payload, timeout=10)
+        _SESSION.post(config['webhook_url'], data=orjson.dumps(payload), headers=_JSON_HEADERS, timeout=10)
 
     def _send_slack(self, monitor, snapshot, config: Dict[str, Any], notification_type: str):
         if notification_type == "change":
@@ -119,7 +171,7 @@ class NotificationService:
         else:
             color = "danger" 
             text = f":x: Error monitoring <{monitor.url}|{monitor.name}>"
-            if snapshot and hasattr(snapshot, 'error_message'):
+            if snapshot and snapshot.error_message:
                 text += f"\n```{snapshot.error_message}```"
 
         payload = {
@@ -131,18 +183,21 @@ class NotificationService:
             }]
         }
 
-        requests.post(config['webhook_url'], json=payload, timeout=10)
+        _SESSION.post(config['webhook_url'], data=orjson.dumps(payload), headers=_JSON_HEADERS, timeout=10)
 
 
 def log_monitor_event(monitor_id: int, event_type: str, message: str = ""):
-    """Log an event for monitoring history"""
+    """Log an event for monitoring history.
+
+    The row is only added to the session; it is written by the caller's
+    next commit so a check costs one commit rather than one per event.
+    """
     history = MonitorHistory(
         monitor_id=monitor_id,
         event_type=event_type,
         message=message
     )
     db.session.add(history)
-    db.session.commit()
 
 
 notification_service = NotificationService()
\ No newline at end of file
@@ -1,18 +1,57 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
-from .extensions import db
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app, session
+from sqlalchemy.orm import defer, selectinload
+from .extensions import db, sqlite_data_version
 from .models import Monitor, Snapshot
-from .services import check_monitor, compute_diff, get_snapshots_by_date_range, get_snapshot_by_date, get_recent_snapshots
+from .models_enhanced import MonitorHistory, monitor_tags
+from .services import check_monitor, check_monitors_concurrently, compute_diff, get_snapshot_range_bounds, get_snapshot_by_date, get_recent_snapshots
 
 
 bp = Blueprint("main", __name__)
 
+# Stay well under SQLite's bound-parameter limit for `id IN (...)` lists
+BULK_CHUNK_SIZE = 500
+
+
+def chunked(ids: list[int], size: int = BULK_CHUNK_SIZE):
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+# Rendered dashboard, reused until SQLite reports a commit from any connection
+_INDEX_CACHE = {"version": None, "html": None}
+
+
+def snapshot_list_loader():
+    """Eager-load a monitor's snapshots without the large text columns list views never show"""
+    return selectinload(Monitor.snapshots).options(
+        defer(Snapshot.content_text),
+        defer(Snapshot.content_raw),
+        defer(Snapshot.diff_html),
+    )
+
 
 @bp.route("/")
 def index():
+    version = sqlite_data_version()
+    # Pending flash messages are rendered into the page, so never cache those
+    cacheable = version is not None and "_flashes" not in session
+    if cacheable and _INDEX_CACHE["version"] == version:
+        return _INDEX_CACHE["html"]
+    
     monitors = (
-        Monitor.query.order_by(Monitor.created_at.desc()).all()
+        Monitor.query.options(
+            defer(Monitor.ignore_text),
+            defer(Monitor.trigger_text),
+            defer(Monitor.custom_headers),
+            snapshot_list_loader(),
+        )
+        .order_by(Monitor.created_at.desc())
+        .all()
     )
-    return render_template("index.html", monitors=monitors)
+    html = render_template("index.html", monitors=monitors)
+    if cacheable:
+        _INDEX_CACHE.update(version=version, html=html)
+    return html
 
 
 @bp.route("/", methods=["POST"])
@@ -83,20 +122,25 @@ def new_monitor():
 
 @bp.route("/monitors/<int:monitor_id>")
 def monitor_detail(monitor_id: int):
-    m = Monitor.query.get_or_404(monitor_id)
-    snaps = (
-        Snapshot.query.filter_by(monitor_id=m.id)
-        .order_by(Snapshot.created_at.desc())
-        .all()
-    )
-    return render_template("monitor_detail.html", monitor=m, snaps=snaps)
+    # Snapshots arrive newest-first via the relationship's order_by
+    m = Monitor.query.options(snapshot_list_loader()).get_or_404(monitor_id)
+    return render_template("monitor_detail.html", monitor=m, snaps=m.snapshots)
 
 
-@bp.route("/monitors/<int:monitor_id>/check", methods=["POST"])
+@bp.route("/monitors/<int:monitor_id>/check", methods=["GET", "POST"])
 def monitor_check(monitor_id: int):
+    """Check a specific monitor immediately"""
     m = Monitor.query.get_or_404(monitor_id)
-    check_monitor(m)
-    flash("Check triggered.", "success")
+    
+    try:
+        check_monitor(m)
+        flash("Check triggered.", "success")
+    except Exception as e:
+        flash(f"Error checking monitor: {str(e)}", "error")
+    
+    # The dashboard triggers checks with a GET; forms on the detail page POST
+    if request.method == "GET":
+        return redirect(url_for("main.index"))
     return redirect(url_for("main.monitor_detail", monitor_id=m.id))
 
 
@@ -108,6 +152,7 @@ def monitor_edit(monitor_id: int):
         m.url = request.form.get("url", m.url).strip() or m.url
         m.css_selector = request.form.get("css_selector") or None
         m.interval_minutes = int(request.form.get("interval_minutes", m.interval_minutes))
+        m.reschedule()
         m.active = bool(request.form.get("active"))
         
         # Update monitoring style options
@@ -181,18 +226,14 @@ def date_comparison(monitor_id: int):
             return render_template("date_comparison.html", monitor=m, recent_snapshots=recent_snapshots)
         
         try:
-            # Get snapshots in the date range
-            snapshots = get_snapshots_by_date_range(monitor_id, start_date, end_date)
+            # Count the snapshots in the date range and fetch its first and last
+            total_snapshots, first_snapshot, last_snapshot = get_snapshot_range_bounds(monitor_id, start_date, end_date)
             
-            if len(snapshots) < 2:
-                flash(f"Not enough snapshots found in the selected date range. Found {len(snapshots)} snapshots.", "warning")
+            if total_snapshots < 2:
+                flash(f"Not enough snapshots found in the selected date range. Found {total_snapshots} snapshots.", "warning")
                 recent_snapshots = get_recent_snapshots(monitor_id, limit=10)
                 return render_template("date_comparison.html", monitor=m, recent_snapshots=recent_snapshots)
             
-            # Compare first and last snapshots in the range
-            first_snapshot = snapshots[0]
-            last_snapshot = snapshots[-1]
-            
             # Compute diff between the two snapshots
             diff_html, change_count = compute_diff(first_snapshot.content_text, last_snapshot.content_text, m.monitor_style)
             
@@ -202,7 +243,7 @@ def date_comparison(monitor_id: int):
                                  last_snapshot=last_snapshot,
                                  diff_html=diff_html,
                                  change_count=change_count,
-                                 total_snapshots=len(snapshots),
+                                 total_snapshots=total_snapshots,
                                  start_date=start_date,
                                  end_date=end_date)
             
@@ -220,50 +261,52 @@ def date_comparison(monitor_id: int):
 def bulk_actions():
     """Handle bulk actions on selected monitors"""
     action = request.form.get("action")
-    monitor_ids = request.form.getlist("monitor_ids")
-    
-    # Temporary debug logging
-    print(f"🔍 DEBUG: Action = {action}")
-    print(f"🔍 DEBUG: Monitor IDs = {monitor_ids}")
-    print(f"🔍 DEBUG: Form data = {dict(request.form)}")
+    monitor_ids = request.form.getlist("monitor_ids", type=int)
     
     if not monitor_ids:
-        print("❌ DEBUG: No monitor IDs received")
         flash("No monitors selected", "warning")
         return redirect(url_for("main.index"))
     
-    monitors = Monitor.query.filter(Monitor.id.in_(monitor_ids)).all()
+    id_chunks = list(chunked(monitor_ids))
     
     if action == "pause":
-        print(f"🔄 DEBUG: Pausing {len(monitors)} monitors")
-        for monitor in monitors:
-            print(f"🔄 DEBUG: Pausing monitor {monitor.id} ({monitor.name})")
-            monitor.is_paused = True
+        count = sum(
+            Monitor.query.filter(Monitor.id.in_(chunk)).update({"is_paused": True}, synchronize_session=False)
+            for chunk in id_chunks
+        )
         db.session.commit()
-        print("✅ DEBUG: Pause operation committed to database")
-        flash(f"Paused {len(monitors)} monitor(s)", "success")
+        flash(f"Paused {count} monitor(s)", "success")
         
     elif action == "unpause":
-        for monitor in monitors:
-            monitor.is_paused = False
+        count = sum(
+            Monitor.query.filter(Monitor.id.in_(chunk)).update({"is_paused": False}, synchronize_session=False)
+            for chunk in id_chunks
+        )
         db.session.commit()
-        flash(f"Unpaused {len(monitors)} monitor(s)", "success")
+        flash(f"Unpaused {count} monitor(s)", "success")
         
     elif action == "recheck":
-        for monitor in monitors:
-            try:
-                check_monitor(monitor.id)
-            except Exception as e:
-                flash(f"Error checking {monitor.url}: {str(e)}", "error")
-        flash(f"Rechecked {len(monitors)} monitor(s)", "success")
+        urls = {}
+        for chunk in id_chunks:
+            urls.update(
+                Monitor.query.filter(Monitor.id.in_(chunk)).with_entities(Monitor.id, Monitor.url).all()
+            )
+        failures = check_monitors_concurrently(current_app._get_current_object(), list(urls))
+        for monitor_id, e in failures:
+            flash(f"Error checking {urls[monitor_id]}: {str(e)}", "error")
+        flash(f"Rechecked {len(urls)} monitor(s)", "success")
         
     elif action == "delete":
-        for monitor in monitors:
-            # Delete associated snapshots first
-            Snapshot.query.filter_by(monitor_id=monitor.id).delete()
-            db.session.delete(monitor)
+        # Bulk deletes skip ORM cascades, so remove every row that references
+        # the monitors (snapshots, tag links, history) before the monitors themselves
+        count = 0
+        for chunk in id_chunks:
+            Snapshot.query.filter(Snapshot.monitor_id.in_(chunk)).delete(synchronize_session=False)
+            db.session.execute(monitor_tags.delete().where(monitor_tags.c.monitor_id.in_(chunk)))
+            MonitorHistory.query.filter(MonitorHistory.monitor_id.in_(chunk)).delete(synchronize_session=False)
+            count += Monitor.query.filter(Monitor.id.in_(chunk)).delete(synchronize_session=False)
         db.session.commit()
-        flash(f"Deleted {len(monitors)} monitor(s)", "success")
+        flash(f"Deleted {count} monitor(s)", "success")
     
     return redirect(url_for("main.index"))
 
@@ -271,15 +314,15 @@ def bulk_actions():
 @bp.route("/recheck-all")
 def recheck_all():
     """Recheck all active monitors"""
-    monitors = Monitor.query.filter_by(is_paused=False).all()
+    urls = dict(
+        Monitor.query.filter_by(is_paused=False).with_entities(Monitor.id, Monitor.url).all()
+    )
     
-    for monitor in monitors:
-        try:
-            check_monitor(monitor.id)
-        except Exception as e:
-            flash(f"Error checking {monitor.url}: {str(e)}", "error")
+    failures = check_monitors_concurrently(current_app._get_current_object(), list(urls))
+    for monitor_id, e in failures:
+        flash(f"Error checking {urls[monitor_id]}: {str(e)}", "error")
     
-    flash(f"Rechecked {len(monitors)} monitor(s)", "success")
+    flash(f"Rechecked {len(urls)} monitor(s)", "success")
     return redirect(url_for("main.index"))
 
 
@@ -291,16 +334,3 @@ def mark_all_viewed():
     flash("All monitors marked as viewed", "success")
     return redirect(url_for("main.index"))
 
-
-@bp.route("/monitors/<int:monitor_id>/check")
-def check_monitor_now(monitor_id):
-    """Check a specific monitor immediately"""
-    monitor = Monitor.query.get_or_404(monitor_id)
-    
-    try:
-        check_monitor(monitor_id)
-        flash(f"Monitor {monitor.url} checked successfully", "success")
-    except Exception as e:
-        flash(f"Error checking monitor: {str(e)}", "error")
-    
-    return redirect(url_for("main.index"))
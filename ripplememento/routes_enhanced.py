@@ -1,37 +1,132 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
-import json
-from .extensions import db
+import time
+import uuid
+from typing import Callable, Optional
+from flask import Blueprint, current_app, g, make_response, render_template, request, redirect, url_for, flash, jsonify, stream_with_context
+import orjson
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import contains_eager, joinedload, selectinload
+from .extensions import db, sqlite_data_version
 from .models_enhanced import Monitor, Snapshot, Tag, NotificationEndpoint, MonitorHistory
-from .services_enhanced import check_monitor, compute_diff, get_monitor_stats
+from .services_enhanced import (
+    cached_diff,
+    check_job_status,
+    compute_diff,
+    diff_line_budget,
+    enqueue_check,
+    get_monitor_stats,
+)
 
 
 bp = Blueprint("main", __name__)
 
+# data_version restarts with the process, so ETags carry a per-process id too
+_ETAG_PREFIX = uuid.uuid4().hex[:8]
+
+
+def data_etag(*parts) -> Optional[str]:
+    """ETag for a response derived only from database state (None if untrackable)"""
+    version = sqlite_data_version()
+    if version is None:
+        return None
+    return "-".join(str(p) for p in (_ETAG_PREFIX, version, *parts))
+
+
+def conditional_response(etag: Optional[str], build: Callable):
+    """Answer 304 when the client already holds etag, otherwise build() and tag the response"""
+    if etag and etag in request.if_none_match:
+        response = current_app.response_class(status=304)
+    else:
+        response = make_response(build())
+    if etag:
+        response.set_etag(etag)
+        response.cache_control.max_age = 5
+    return response
+
+
+# Monitor form fields -> (cast, default); a blank field takes the default
+MONITOR_FORM_FIELDS = {
+    "name": (str, ""),
+    "url": (str, ""),
+    "css_selector": (str, None),
+    "headers": (str, None),
+    "ignore_text": (str, None),
+    "trigger_text": (str, None),
+    "interval_minutes": (int, 30),
+}
+
+
+def parse_monitor_form(form, **defaults) -> dict:
+    """Read the monitor fields shared by the create and edit forms.
+
+    Keyword arguments override the table defaults, e.g. to keep a monitor's
+    current name when the field is submitted blank.
+    """
+    data = {}
+    for field, (cast, default) in MONITOR_FORM_FIELDS.items():
+        value = form.get(field, "").strip()
+        data[field] = cast(value) if value else defaults.get(field, default)
+    data["notification_enabled"] = "notification_enabled" in form
+    return data
+
+
+def all_tags() -> list[Tag]:
+    """Every tag ordered by name, fetched at most once per request"""
+    if "all_tags" not in g:
+        g.all_tags = Tag.query.order_by(Tag.name).all()
+    return g.all_tags
+
+
+def resolve_tags(tags_field: str) -> list[Tag]:
+    """Map a comma-separated tag field to Tag rows, creating missing tags.
+
+    Creation is one INSERT OR IGNORE against the unique name, so concurrent
+    submits naming the same new tag cannot collide; one IN query then loads them.
+    """
+    names = list(dict.fromkeys(n.strip() for n in tags_field.split(",") if n.strip()))
+    if not names:
+        return []
+    
+    db.session.execute(
+        sqlite_insert(Tag)
+        .values([{"name": n} for n in names])
+        .on_conflict_do_nothing(index_elements=["name"])
+    )
+    by_name = {t.name: t for t in Tag.query.filter(Tag.name.in_(names)).all()}
+    return [by_name[n] for n in names]
+
 
 @bp.route("/")
 def index():
     tag_filter = request.args.get('tag')
     status_filter = request.args.get('status')
+    page = request.args.get('page', 1, type=int)
+    per_page = 50
     
-    query = Monitor.query
+    # Tags are rendered for every row; snapshots are not
+    query = Monitor.query.options(selectinload(Monitor.tags))
     
     if tag_filter:
         query = query.join(Monitor.tags).filter(Tag.name == tag_filter)
     
-    monitors = query.order_by(Monitor.created_at.desc()).all()
-    
     if status_filter:
-        monitors = [m for m in monitors if m.status == status_filter]
+        query = query.filter(Monitor.status == status_filter)
+    
+    pagination = query.order_by(Monitor.created_at.desc()).paginate(
+        page=page, per_page=per_page, error_out=False
+    )
     
-    tags = Tag.query.all()
+    tags = all_tags()
     
-    # Stats for dashboard
-    total_monitors = len(monitors)
-    active_monitors = len([m for m in monitors if m.active])
-    error_monitors = len([m for m in monitors if m.status == "error"])
+    # Stats for dashboard, aggregated by the database in one query
+    total_monitors, active_monitors, error_monitors = query.with_entities(
+        db.func.count(Monitor.id),
+        db.func.coalesce(db.func.sum(db.case((Monitor.active, 1), else_=0)), 0),
+        db.func.coalesce(db.func.sum(db.case((Monitor.status == "error", 1), else_=0)), 0),
+    ).one()
     
     return render_template("index_enhanced.html", 
-                         monitors=monitors, 
+                         monitors=pagination.items, 
+                         pagination=pagination,
                          tags=tags,
                          stats={
                              'total': total_monitors,
@@ -43,55 +138,31 @@ def index():
 @bp.route("/monitors/new", methods=["GET", "POST"])
 def new_monitor():
     if request.method == "POST":
-        name = request.form.get("name", "").strip()
-        url = request.form.get("url", "").strip()
-        css = request.form.get("css_selector") or None
-        headers = request.form.get("headers") or None
-        ignore_text = request.form.get("ignore_text") or None
-        trigger_text = request.form.get("trigger_text") or None
-        interval = int(request.form.get("interval_minutes", 30) or 30)
-        notification_enabled = bool(request.form.get("notification_enabled"))
+        data = parse_monitor_form(request.form)
         
-        # Validate headers JSON
-        if headers:
+        # Validate headers JSON and store it re-serialized in canonical form
+        if data["headers"]:
             try:
-                json.loads(headers)
-            except:
+                data["headers"] = orjson.dumps(orjson.loads(data["headers"])).decode()
+            except orjson.JSONDecodeError:
                 flash("Invalid JSON in headers field.", "error")
                 return redirect(url_for("main.new_monitor"))
         
-        if not name or not url:
+        if not data["name"] or not data["url"]:
             flash("Name and URL are required.", "error")
             return redirect(url_for("main.new_monitor"))
             
-        m = Monitor(
-            name=name, 
-            url=url, 
-            css_selector=css,
-            headers=headers,
-            ignore_text=ignore_text,
-            trigger_text=trigger_text,
-            interval_minutes=interval,
-            notification_enabled=notification_enabled
-        )
+        m = Monitor(**data)
         
         # Handle tags
-        tag_names = request.form.get("tags", "").split(",")
-        for tag_name in tag_names:
-            tag_name = tag_name.strip()
-            if tag_name:
-                tag = Tag.query.filter_by(name=tag_name).first()
-                if not tag:
-                    tag = Tag(name=tag_name)
-                    db.session.add(tag)
-                m.tags.append(tag)
+        m.tags = resolve_tags(request.form.get("tags", ""))
         
         db.session.add(m)
         db.session.commit()
         flash("Monitor created.", "success")
         return redirect(url_for("main.index"))
         
-    tags = Tag.query.all()
+    tags = all_tags()
     return render_template("new_monitor_enhanced.html", tags=tags)
 
 
@@ -128,17 +199,8 @@ def monitor_detail(monitor_id: int):
 @bp.route("/monitors/<int:monitor_id>/check", methods=["POST"])
 def monitor_check(monitor_id: int):
     m = Monitor.query.get_or_404(monitor_id)
-    try:
-        result = check_monitor(m)
-        if result and result.error_message:
-            flash(f"Check failed: {result.error_message}", "error")
-        elif result:
-            flash("Change detected!", "success")
-        else:
-            flash("No changes detected.", "info")
-    except Exception as e:
-        flash(f"Check failed: {str(e)}", "error")
-    
+    enqueue_check(current_app._get_current_object(), m.id)
+    flash("Check started; new snapshots will appear here shortly.", "info")
     return redirect(url_for("main.monitor_detail", monitor_id=m.id))
 
 
@@ -146,41 +208,31 @@ def monitor_check(monitor_id: int):
 def monitor_edit(monitor_id: int):
     m = Monitor.query.get_or_404(monitor_id)
     if request.method == "POST":
-        m.name = request.form.get("name", m.name).strip() or m.name
-        m.url = request.form.get("url", m.url).strip() or m.url
-        m.css_selector = request.form.get("css_selector") or None
-        m.headers = request.form.get("headers") or None
-        m.ignore_text = request.form.get("ignore_text") or None
-        m.trigger_text = request.form.get("trigger_text") or None
-        m.interval_minutes = int(request.form.get("interval_minutes", m.interval_minutes))
-        m.active = bool(request.form.get("active"))
-        m.notification_enabled = bool(request.form.get("notification_enabled"))
+        data = parse_monitor_form(
+            request.form, name=m.name, url=m.url, interval_minutes=m.interval_minutes
+        )
         
-        # Validate headers JSON
-        if m.headers:
+        # Validate headers JSON and store it re-serialized in canonical form
+        if data["headers"]:
             try:
-                json.loads(m.headers)
-            except:
+                data["headers"] = orjson.dumps(orjson.loads(data["headers"])).decode()
+            except orjson.JSONDecodeError:
                 flash("Invalid JSON in headers field.", "error")
                 return redirect(url_for("main.monitor_edit", monitor_id=m.id))
         
+        for field, value in data.items():
+            setattr(m, field, value)
+        m.active = "active" in request.form
+        m.reschedule()
+        
         # Update tags
-        m.tags.clear()
-        tag_names = request.form.get("tags", "").split(",")
-        for tag_name in tag_names:
-            tag_name = tag_name.strip()
-            if tag_name:
-                tag = Tag.query.filter_by(name=tag_name).first()
-                if not tag:
-                    tag = Tag(name=tag_name)
-                    db.session.add(tag)
-                m.tags.append(tag)
+        m.tags = resolve_tags(request.form.get("tags", ""))
         
         db.session.commit()
         flash("Monitor updated.", "success")
         return redirect(url_for("main.monitor_detail", monitor_id=m.id))
         
-    tags = Tag.query.all()
+    tags = all_tags()
     return render_template("edit_monitor_enhanced.html", monitor=m, tags=tags)
 
 
@@ -195,8 +247,13 @@ def monitor_delete(monitor_id: int):
 
 @bp.route("/monitors/<int:monitor_id>/snapshots/<int:snapshot_id>")
 def snapshot_detail(monitor_id: int, snapshot_id: int):
-    m = Monitor.query.get_or_404(monitor_id)
-    snap = Snapshot.query.get_or_404(snapshot_id)
+    # One lookup scoped to the monitor, with the monitor joined into it
+    snap = (
+        Snapshot.query.options(joinedload(Snapshot.monitor))
+        .filter_by(id=snapshot_id, monitor_id=monitor_id)
+        .first_or_404()
+    )
+    m = snap.monitor
     prev = (
         Snapshot.query.filter(
             Snapshot.monitor_id == m.id, 
@@ -209,11 +266,17 @@ def snapshot_detail(monitor_id: int, snapshot_id: int):
     
     diff_html = ""
     if prev and not snap.error_message:
-        diff_html = compute_diff(prev.content_text if prev else "", snap.content_text)
+        if snap.content_hash:
+            diff_html = cached_diff(prev.content_hash, snap.content_hash)
+        else:
+            prev_text, snap_text = prev.content_text or "", snap.content_text or ""
+            diff_html = compute_diff(prev_text, snap_text, max_d=diff_line_budget(prev_text, snap_text))
+        if diff_html is None:
+            diff_html = "<p class='text-slate-600'>Content changed substantially — too different to diff inline.</p>"
     
     return render_template("snapshot_detail_enhanced.html", 
                          monitor=m, 
-                         snap=snap, 
+                         snapshot=snap, 
                          prev=prev, 
                          diff_html=diff_html)
 
@@ -245,15 +308,20 @@ def new_notification():
         elif notification_type in ["discord", "slack"]:
             config = {"webhook_url": request.form.get("webhook_url")}
         elif notification_type == "webhook":
+            try:
+                webhook_headers = orjson.loads(request.form.get("headers") or "{}")
+            except orjson.JSONDecodeError:
+                flash("Invalid JSON in headers field.", "error")
+                return redirect(url_for("main.new_notification"))
             config = {
                 "url": request.form.get("webhook_url"),
-                "headers": json.loads(request.form.get("headers", "{}"))
+                "headers": webhook_headers
             }
         
         endpoint = NotificationEndpoint(
             name=name,
             type=notification_type,
-            config=json.dumps(config)
+            config=config
         )
         db.session.add(endpoint)
         db.session.commit()
@@ -265,15 +333,23 @@ def new_notification():
 
 @bp.route("/analytics")
 def analytics():
-    # Overall stats
-    total_monitors = Monitor.query.count()
-    active_monitors = Monitor.query.filter_by(active=True).count()
-    total_snapshots = Snapshot.query.count()
-    total_changes = Snapshot.query.filter(Snapshot.content_hash.isnot(None)).count()
+    return conditional_response(data_etag(), render_analytics)
+
+
+def render_analytics():
+    # Overall stats, as scalar subqueries in a single round-trip
+    count = db.func.count
+    total_monitors, active_monitors, total_snapshots, total_changes = db.session.query(
+        db.select(count(Monitor.id)).scalar_subquery(),
+        db.select(count(Monitor.id)).where(Monitor.active.is_(True)).scalar_subquery(),
+        db.select(count(Snapshot.id)).scalar_subquery(),
+        db.select(count(Snapshot.id)).where(Snapshot.content_hash.isnot(None)).scalar_subquery(),
+    ).one()
     
     # Recent activity
     recent_changes = (
         Snapshot.query.join(Monitor)
+        .options(contains_eager(Snapshot.monitor))
         .filter(Snapshot.content_hash.isnot(None))
         .order_by(Snapshot.created_at.desc())
         .limit(10)
@@ -292,26 +368,50 @@ def analytics():
 # API endpoints
 @bp.route("/api/monitors")
 def api_monitors():
-    monitors = Monitor.query.all()
-    return jsonify([{
-        'id': m.id,
-        'name': m.name,
-        'url': m.url,
-        'status': m.status,
-        'last_checked': m.last_checked.isoformat() if m.last_checked else None,
-        'total_changes': m.total_changes
-    } for m in monitors])
+    # status turns "stale" with the passage of time alone, so roll the tag each minute
+    return conditional_response(data_etag(int(time.time() // 60)), monitors_json)
+
+
+def monitors_json():
+    # Plain column rows (status via its SQL expression), no ORM instances,
+    # streamed out one 500-row batch at a time
+    stmt = db.select(
+        Monitor.id, Monitor.name, Monitor.url, Monitor.status, Monitor.last_checked, Monitor.total_changes
+    ).execution_options(yield_per=500)
+    
+    def generate():
+        yield b"["
+        first = True
+        for rows in db.session.execute(stmt).partitions():
+            # Encode the batch as one array and drop its brackets
+            batch = orjson.dumps([{
+                'id': id_,
+                'name': name,
+                'url': url,
+                'status': status,
+                'last_checked': last_checked,
+                'total_changes': total_changes
+            } for id_, name, url, status, last_checked, total_changes in rows])[1:-1]
+            yield batch if first else b"," + batch
+            first = False
+        yield b"]"
+    
+    return current_app.response_class(stream_with_context(generate()), mimetype="application/json")
 
 
 @bp.route("/api/monitors/<int:monitor_id>/check", methods=["POST"])
 def api_monitor_check(monitor_id: int):
     m = Monitor.query.get_or_404(monitor_id)
-    try:
-        result = check_monitor(m)
-        return jsonify({
-            'success': True,
-            'changed': bool(result and result.content_hash),
-            'error': result.error_message if result else None
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
\ No newline at end of file
+    job_id = enqueue_check(current_app._get_current_object(), m.id)
+    return jsonify({
+        'job_id': job_id,
+        'status_url': url_for("main.api_check_status", job_id=job_id)
+    }), 202
+
+
+@bp.route("/api/checks/<job_id>")
+def api_check_status(job_id: str):
+    status = check_job_status(job_id)
+    if status is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(status)
\ No newline at end of file
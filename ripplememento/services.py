@@ -1,10 +1,19 @@
 import hashlib
 import json
 import re
-from typing import Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from difflib import SequenceMatcher
+from functools import lru_cache
+from http.cookiejar import DefaultCookiePolicy
+from typing import Dict, Optional
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
-from diff_match_patch import diff_match_patch
+from markupsafe import escape
 from .models import Monitor, Snapshot
 from .extensions import db
 
@@ -14,31 +23,89 @@ USER_AGENT = (
     "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125 Safari/537.36"
 )
 
-
-def fetch_text(url: str, css_selector: Optional[str] = None, custom_headers: Optional[str] = None) -> str:
+def _build_session() -> requests.Session:
+    """Keep-alive pool shared by every page fetch; cookies are refused so each check stays stateless"""
+    session = requests.Session()
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    adapter = HTTPAdapter(
+        pool_connections=64,
+        pool_maxsize=64,
+        max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504)),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+HTTP_SESSION = _build_session()
+
+# Ids of monitors with a check_monitor_by_id call running, so overlapping
+# scheduled and bulk checks of one monitor collapse into a single check
+_IN_FLIGHT: set[int] = set()
+_IN_FLIGHT_LOCK = threading.Lock()
+
+# Combined size above which diff_match_patch styles fall back to the line diff
+DMP_MAX_INPUT = 200_000
+
+# diff_match_patch keeps no per-call state, so one instance serves every diff;
+# it is built on first use so importing this module stays cheap
+_DMP = None
+
+
+def get_dmp():
+    """Shared diff_match_patch instance for the basic and enhanced diff renderers"""
+    global _DMP
+    if _DMP is None:
+        from diff_match_patch import diff_match_patch
+        dmp = diff_match_patch()
+        # Past the timeout diff_main returns a valid but coarser diff instead of
+        # grinding through dissimilar documents
+        dmp.Diff_Timeout = 1.0
+        dmp.Diff_EditCost = 4
+        _DMP = dmp
+    return _DMP
+
+# Paragraphs are separated by a blank (or whitespace-only) line
+PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+WHITESPACE_RUN = re.compile(r'\s+')
+# Words and the whitespace between them, so joined tokens reproduce the text exactly
+WORD_TOKENS = re.compile(r'\s+|\S+')
+# Any whitespace other than a single space; text without it is single-spaced
+IRREGULAR_SPACING = re.compile(r'[^\S ]| {2}')
+# Non-content elements, cut from the raw markup so the parser never builds them
+NON_CONTENT_ELEMENTS = re.compile(rb'<(script|style|noscript)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+# A run of 19+ digits may be an integer outside orjson's 64-bit range, which it
+# would parse as a float; such documents are normalized with the stdlib instead
+LONG_DIGIT_RUN = re.compile(r'\d{19}')
+
+
+def fetch_page(url: str, custom_headers: Optional[Dict[str, str]] = None) -> requests.Response:
     headers = {"User-Agent": USER_AGENT}
-    
-    # Parse custom headers if provided
     if custom_headers:
-        try:
-            headers.update(json.loads(custom_headers))
-        except:
-            pass
+        headers.update(custom_headers)
     
-    resp = requests.get(url, headers=headers, timeout=30)
+    resp = HTTP_SESSION.get(url, headers=headers, timeout=30)
     resp.raise_for_status()
-    soup = BeautifulSoup(resp.text, "html.parser")
-    
+    return resp
+
+
+def extract_text(content: bytes, css_selector: Optional[str] = None, encoding: Optional[str] = None) -> str:
     if css_selector:
+        soup = BeautifulSoup(content, "lxml", from_encoding=encoding)
         node = soup.select_one(css_selector)
-        if node:
-            return resp.text, node.get_text("\n", strip=True)
-        else:
-            return resp.text, ""
-    else:
-        for s in soup(["script", "style", "noscript"]):
-            s.decompose()
-        return resp.text, soup.get_text("\n", strip=True)
+        return node.get_text("\n", strip=True) if node else ""
+    soup = BeautifulSoup(NON_CONTENT_ELEMENTS.sub(b"", content), "lxml", from_encoding=encoding)
+    return soup.get_text("\n", strip=True)
+
+
+def page_fingerprint(content: bytes, *settings) -> bytes:
+    """Digest of the raw response bytes and the settings that shape its processing.
+
+    Equal fingerprints mean the processed text is unchanged, without parsing.
+    """
+    digest = hashlib.blake2b(repr(settings).encode("utf-8"), digest_size=16)
+    digest.update(content)
+    return digest.digest()
 
 
 def process_content_by_style(content: str, style: str, ignore_whitespace: bool = True, ignore_case: bool = False) -> str:
@@ -60,7 +127,7 @@ def process_content_by_style(content: str, style: str, ignore_whitespace: bool =
     
     elif style == 'paragraphs':
         # Process paragraph by paragraph (double newlines separate paragraphs)
-        paragraphs = re.split(r'\n\s*\n', content)
+        paragraphs = PARAGRAPH_BREAK.split(content)
         if ignore_whitespace:
             paragraphs = [p.strip() for p in paragraphs if p.strip()]
         return '\n\n'.join(paragraphs)
@@ -68,15 +135,17 @@ def process_content_by_style(content: str, style: str, ignore_whitespace: bool =
     elif style == 'chars':
         # Character-level monitoring
         if ignore_whitespace:
-            return re.sub(r'\s+', ' ', content).strip()
+            return WHITESPACE_RUN.sub(' ', content).strip()
         return content
     
     elif style == 'json':
         # Try to parse and normalize JSON
         try:
-            parsed = json.loads(content)
-            return json.dumps(parsed, sort_keys=True, separators=(',', ':'))
-        except:
+            if LONG_DIGIT_RUN.search(content):
+                return json.dumps(json.loads(content), sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+            parsed = orjson.loads(content)
+            return orjson.dumps(parsed, option=orjson.OPT_SORT_KEYS).decode()
+        except ValueError:
             # If not valid JSON, fall back to text processing
             return content.strip()
     
@@ -84,29 +153,45 @@ def process_content_by_style(content: str, style: str, ignore_whitespace: bool =
     return content
 
 
+def ignore_regex(patterns) -> Optional[re.Pattern]:
+    """Compile ignore patterns into one literal alternation (None if there are none).
+
+    Longest patterns come first so a pattern wins over its own prefixes.
+    """
+    if not patterns:
+        return None
+    return re.compile("|".join(re.escape(p) for p in sorted(patterns, key=len, reverse=True)))
+
+
+@lru_cache(maxsize=500)
+def filter_patterns(ignore_text: Optional[str], trigger_text: Optional[str]) -> tuple[Optional[re.Pattern], tuple[str, ...]]:
+    """Ignore regex and lowercased trigger patterns, built once per distinct setting"""
+    ignore_patterns = {p.strip() for p in (ignore_text or "").split('\n') if p.strip()}
+    trigger_patterns = tuple(p.strip().lower() for p in (trigger_text or "").split('\n') if p.strip())
+    return ignore_regex(ignore_patterns), trigger_patterns
+
+
 def apply_filters(text: str, monitor: Monitor) -> str:
     """Apply ignore/trigger text filters"""
-    if monitor.ignore_text:
-        ignore_patterns = [p.strip() for p in monitor.ignore_text.split('\n') if p.strip()]
-        for pattern in ignore_patterns:
-            text = text.replace(pattern, '')
-    
-    if monitor.trigger_text:
-        trigger_patterns = [p.strip() for p in monitor.trigger_text.split('\n') if p.strip()]
-        # Only return text if it contains any trigger pattern
-        if not any(pattern.lower() in text.lower() for pattern in trigger_patterns):
+    ignore_pattern, trigger_patterns = filter_patterns(monitor.ignore_text, monitor.trigger_text)
+    if ignore_pattern is not None:
+        text = ignore_pattern.sub('', text)
+    
+    if trigger_patterns:
+        # Only return text if it contains any trigger pattern (case-insensitive)
+        text_lower = text.lower()
+        if not any(pattern in text_lower for pattern in trigger_patterns):
             return ""
     
     return text.strip()
 
 
-def hash_text(text: str) -> str:
-    """Calculate MD5 hash for change detection (new approach)"""
-    import hashlib
-    return hashlib.md5(text.encode("utf-8")).hexdigest()
+def hash_text(text: str) -> bytes:
+    """Calculate a 128-bit BLAKE2b digest for change detection (new approach)"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
 
 
-def calculate_content_hash(content: str, style: str, ignore_whitespace: bool = True, ignore_case: bool = False) -> str:
+def calculate_content_hash(content: str, style: str, ignore_whitespace: bool = True, ignore_case: bool = False) -> bytes:
     """Calculate hash after applying style-specific processing (new approach)"""
     processed = process_content_by_style(content, style, ignore_whitespace, ignore_case)
     return hash_text(processed)
@@ -118,40 +203,81 @@ def compute_diff(prev: str, current: str, style: str = 'words') -> tuple[str, in
     # For JavaScript-based diff switching, we'll store both versions and let client handle rendering
     # But also provide server-side fallback
     
-    if style == 'paragraphs':
-        # Paragraph-aware diff with inline changes
-        return compute_paragraph_diff(prev, current, diff_match_patch())
-    elif style == 'lines':
-        # Line-by-line diff with inline changes  
-        return compute_line_diff(prev, current, diff_match_patch())
-    elif style == 'chars':
-        # Character-by-character diff
-        return compute_char_diff(prev, current, diff_match_patch())
-    elif style == 'words':
-        # Word-based diff
-        return compute_word_diff(prev, current, diff_match_patch())
-    elif style == 'json':
-        # JSON-aware diff
-        return compute_json_diff(prev, current, diff_match_patch())
-    else:
-        # Default to word-based diff
-        return compute_word_diff(prev, current, diff_match_patch())
+    if prev == current:
+        # A plain string compare settles unchanged content without any diffing
+        return f"<div class='diff-content'><span class='text-gray-700'>{escape_html(current)}</span></div>", 0
+    
+    renderer = DIFF_RENDERERS.get(style, compute_word_diff)
+    if renderer not in (compute_paragraph_diff, compute_line_diff) and len(prev) + len(current) > DMP_MAX_INPUT:
+        # Huge documents are matched line by line, which stays near linear
+        renderer = compute_line_diff
+    return renderer(prev, current)
+
+
+def word_diff_spans(old: str, new: str, added_class: str, removed_class: str) -> tuple[str, int]:
+    """Inline diff of two blocks aligned on word tokens; returns (html, changed word count).
+
+    Tokens alternate between words and whitespace runs, so the words in a
+    slice follow from its length and whether it opens on a word.
+    """
+    old_tokens = WORD_TOKENS.findall(old)
+    new_tokens = WORD_TOKENS.findall(new)
+    
+    html = []
+    changes = 0
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, old_tokens, new_tokens, autojunk=False).get_opcodes():
+        if tag == 'equal':
+            html.append(escape_html(''.join(new_tokens[j1:j2])))
+            continue
+        if i1 < i2:  # Deletion (also the old half of a replace)
+            removed = ''.join(old_tokens[i1:i2])
+            changes += (i2 - i1 + (not removed[0].isspace())) // 2
+            html.append(f"<span class='{removed_class}' title='Removed'>{escape_html(removed)}</span>")
+        if j1 < j2:  # Insertion (also the new half of a replace)
+            added = ''.join(new_tokens[j1:j2])
+            changes += (j2 - j1 + (not added[0].isspace())) // 2
+            html.append(f"<span class='{added_class}' title='Added'>{escape_html(added)}</span>")
+    return ''.join(html), changes
+
+
+def trimmed_opcodes(a: list[str], b: list[str]) -> list[tuple[str, int, int, int, int]]:
+    """SequenceMatcher opcodes for a -> b, matching only the changed middle.
+
+    The shared head and tail are emitted as 'equal' blocks directly, so the
+    quadratic matcher only ever sees the region that actually differs.
+    """
+    limit = min(len(a), len(b))
+    start = 0
+    while start < limit and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < limit - start and a[-end - 1] == b[-end - 1]:
+        end += 1
+    a_end, b_end = len(a) - end, len(b) - end
+    
+    opcodes = [('equal', 0, start, 0, start)] if start else []
+    if start < a_end or start < b_end:
+        matcher = SequenceMatcher(None, a[start:a_end], b[start:b_end], autojunk=False)
+        opcodes.extend(
+            (tag, i1 + start, i2 + start, j1 + start, j2 + start)
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        )
+    if end:
+        opcodes.append(('equal', a_end, len(a), b_end, len(b)))
+    return opcodes
 
 
-def compute_paragraph_diff(prev: str, current: str, dmp) -> tuple[str, int]:
+def compute_paragraph_diff(prev: str, current: str) -> tuple[str, int]:
     """Generate paragraph-aware diff showing inline changes within paragraphs"""
     # Split into paragraphs
-    prev_paragraphs = re.split(r'\n\s*\n', prev)
-    current_paragraphs = re.split(r'\n\s*\n', current)
+    prev_paragraphs = PARAGRAPH_BREAK.split(prev)
+    current_paragraphs = PARAGRAPH_BREAK.split(current)
     
     html = []
     total_changes = 0
     
     # Use SequenceMatcher to find which paragraphs correspond
-    from difflib import SequenceMatcher
-    matcher = SequenceMatcher(None, prev_paragraphs, current_paragraphs)
-    
-    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+    for tag, i1, i2, j1, j2 in trimmed_opcodes(prev_paragraphs, current_paragraphs):
         if tag == 'equal':
             # Unchanged paragraphs
             for p in current_paragraphs[j1:j2]:
@@ -161,27 +287,17 @@ def compute_paragraph_diff(prev: str, current: str, dmp) -> tuple[str, int]:
         elif tag == 'replace':
             # Modified paragraphs - show inline changes
             for old_p, new_p in zip(prev_paragraphs[i1:i2], current_paragraphs[j1:j2]):
-                para_diffs = dmp.diff_main(old_p, new_p)
-                dmp.diff_cleanupSemantic(para_diffs)
-                
-                para_html = []
-                para_changes = 0
-                
-                for op, data in para_diffs:
-                    if op == 0:  # Equal
-                        para_html.append(escape_html(data))
-                    elif op == 1:  # Insertion
-                        para_changes += len(data.split())
-                        para_html.append(f"<span class='bg-green-100 text-green-800 px-1 rounded font-medium' title='Added'>{escape_html(data)}</span>")
-                    else:  # Deletion
-                        para_changes += len(data.split())
-                        para_html.append(f"<span class='bg-red-100 text-red-800 px-1 rounded font-medium line-through' title='Removed'>{escape_html(data)}</span>")
+                para_html, para_changes = word_diff_spans(
+                    old_p, new_p,
+                    added_class='bg-green-100 text-green-800 px-1 rounded font-medium',
+                    removed_class='bg-red-100 text-red-800 px-1 rounded font-medium line-through',
+                )
                 
                 if para_changes > 0:
-                    html.append(f"<p class='bg-yellow-50 border-l-4 border-yellow-400 pl-4 mb-4 text-gray-800'>{''.join(para_html)}</p>")
+                    html.append(f"<p class='bg-yellow-50 border-l-4 border-yellow-400 pl-4 mb-4 text-gray-800'>{para_html}</p>")
                     total_changes += para_changes
                 else:
-                    html.append(f"<p class='text-gray-700 mb-4'>{''.join(para_html)}</p>")
+                    html.append(f"<p class='text-gray-700 mb-4'>{para_html}</p>")
         
         elif tag == 'delete':
             # Deleted paragraphs
@@ -200,7 +316,7 @@ def compute_paragraph_diff(prev: str, current: str, dmp) -> tuple[str, int]:
     return "".join(html), total_changes
 
 
-def compute_line_diff(prev: str, current: str, dmp) -> tuple[str, int]:
+def compute_line_diff(prev: str, current: str) -> tuple[str, int]:
     """Generate line-aware diff showing inline changes within lines"""
     prev_lines = prev.split('\n')
     current_lines = current.split('\n')
@@ -208,12 +324,9 @@ def compute_line_diff(prev: str, current: str, dmp) -> tuple[str, int]:
     html = []
     total_changes = 0
     
-    from difflib import SequenceMatcher
-    matcher = SequenceMatcher(None, prev_lines, current_lines)
-    
     html.append("<div class='font-mono text-sm'>")
     
-    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+    for tag, i1, i2, j1, j2 in trimmed_opcodes(prev_lines, current_lines):
         if tag == 'equal':
             # Unchanged lines
             for line in current_lines[j1:j2]:
@@ -222,27 +335,17 @@ def compute_line_diff(prev: str, current: str, dmp) -> tuple[str, int]:
         elif tag == 'replace':
             # Modified lines - show inline changes
             for old_line, new_line in zip(prev_lines[i1:i2], current_lines[j1:j2]):
-                line_diffs = dmp.diff_main(old_line, new_line)
-                dmp.diff_cleanupSemantic(line_diffs)
-                
-                line_html = []
-                line_changes = 0
-                
-                for op, data in line_diffs:
-                    if op == 0:  # Equal
-                        line_html.append(escape_html(data))
-                    elif op == 1:  # Insertion
-                        line_changes += len(data)
-                        line_html.append(f"<span class='bg-green-100 text-green-800 px-1 rounded' title='Added'>{escape_html(data)}</span>")
-                    else:  # Deletion
-                        line_changes += len(data)
-                        line_html.append(f"<span class='bg-red-100 text-red-800 px-1 rounded line-through' title='Removed'>{escape_html(data)}</span>")
+                line_html, line_changes = word_diff_spans(
+                    old_line, new_line,
+                    added_class='bg-green-100 text-green-800 px-1 rounded',
+                    removed_class='bg-red-100 text-red-800 px-1 rounded line-through',
+                )
                 
                 if line_changes > 0:
-                    html.append(f"<div class='bg-yellow-50 border-l-4 border-yellow-400 pl-2 py-1'>{''.join(line_html)}</div>")
+                    html.append(f"<div class='bg-yellow-50 border-l-4 border-yellow-400 pl-2 py-1'>{line_html}</div>")
                     total_changes += 1
                 else:
-                    html.append(f"<div class='text-gray-700 py-1'>{''.join(line_html)}</div>")
+                    html.append(f"<div class='text-gray-700 py-1'>{line_html}</div>")
         
         elif tag == 'delete':
             # Deleted lines
@@ -260,8 +363,26 @@ def compute_line_diff(prev: str, current: str, dmp) -> tuple[str, int]:
     return "".join(html), total_changes
 
 
-def compute_word_diff(prev: str, current: str, dmp) -> tuple[str, int]:
+def split_word_count(text: str) -> int:
+    """Word count of arbitrarily spaced text"""
+    return len(text.split())
+
+
+def spaced_word_count(text: str) -> int:
+    """Word count of single-spaced text, from its spaces alone"""
+    if not text:
+        return 0
+    return text.count(' ') + 1 - text.startswith(' ') - text.endswith(' ')
+
+
+def compute_word_diff(prev: str, current: str, dmp=None) -> tuple[str, int]:
     """Generate word-based diff with enhanced formatting"""
+    dmp = dmp or get_dmp()
+    # The words style stores single-spaced text, where spaces alone give the word count
+    if IRREGULAR_SPACING.search(prev) or IRREGULAR_SPACING.search(current):
+        count_words = split_word_count
+    else:
+        count_words = spaced_word_count
     diffs = dmp.diff_main(prev, current)
     dmp.diff_cleanupSemantic(diffs)
     
@@ -281,11 +402,11 @@ def compute_word_diff(prev: str, current: str, dmp) -> tuple[str, int]:
                     data = f"{context_start} <span class='text-center text-gray-400 text-sm px-2 py-1 bg-gray-100 rounded'>... ({len(words)-20} words unchanged) ...</span> {context_end}"
             html.append(f"<span class='text-gray-700'>{escape_html(data)}</span>")
         elif op == 1:  # Insertion
-            word_count = len(data.split())
+            word_count = count_words(data)
             change_count += word_count
             html.append(f"<span class='bg-green-100 text-green-800 px-1 rounded font-medium border-l-2 border-green-400' title='Added {word_count} word(s)'>{escape_html(data)}</span>")
         else:  # Deletion
-            word_count = len(data.split())
+            word_count = count_words(data)
             change_count += word_count
             html.append(f"<span class='bg-red-100 text-red-800 px-1 rounded font-medium line-through border-l-2 border-red-400' title='Removed {word_count} word(s)'>{escape_html(data)}</span>")
     
@@ -293,8 +414,9 @@ def compute_word_diff(prev: str, current: str, dmp) -> tuple[str, int]:
     return "".join(html), change_count
 
 
-def compute_char_diff(prev: str, current: str, dmp) -> tuple[str, int]:
+def compute_char_diff(prev: str, current: str, dmp=None) -> tuple[str, int]:
     """Generate character-based diff with enhanced formatting"""
+    dmp = dmp or get_dmp()
     diffs = dmp.diff_main(prev, current)
     dmp.diff_cleanupSemantic(diffs)
     
@@ -326,18 +448,19 @@ def compute_char_diff(prev: str, current: str, dmp) -> tuple[str, int]:
     return "".join(html), change_count
 
 
-def compute_json_diff(prev: str, current: str, dmp) -> tuple[str, int]:
+def compute_json_diff(prev: str, current: str, dmp=None) -> tuple[str, int]:
     """Generate JSON-aware diff with enhanced formatting"""
-    import json
+    dmp = dmp or get_dmp()
     
     try:
         # Try to parse as JSON for intelligent comparison
-        prev_json = json.loads(prev) if prev.strip() else {}
-        current_json = json.loads(current) if current.strip() else {}
+        prev_json = orjson.loads(prev) if prev.strip() else {}
+        current_json = orjson.loads(current) if current.strip() else {}
         
         # Pretty format for comparison
-        prev_formatted = json.dumps(prev_json, indent=2, sort_keys=True)
-        current_formatted = json.dumps(current_json, indent=2, sort_keys=True)
+        pretty = orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS
+        prev_formatted = orjson.dumps(prev_json, option=pretty).decode()
+        current_formatted = orjson.dumps(current_json, option=pretty).decode()
         
         # Use line-based diff for formatted JSON
         diffs = dmp.diff_main(prev_formatted, current_formatted)
@@ -362,22 +485,38 @@ def compute_json_diff(prev: str, current: str, dmp) -> tuple[str, int]:
         
         html.append("</div>")
         
-    except (json.JSONDecodeError, TypeError):
+    except (orjson.JSONDecodeError, orjson.JSONEncodeError):
         # Fall back to regular text diff if not valid JSON
         return compute_word_diff(prev, current, dmp)
     
     return "".join(html), change_count
 
 
+# Diff renderer per monitor style; anything unknown gets the word diff
+DIFF_RENDERERS = {
+    'paragraphs': compute_paragraph_diff,
+    'lines': compute_line_diff,
+    'chars': compute_char_diff,
+    'words': compute_word_diff,
+    'json': compute_json_diff,
+}
+
+
 def escape_html(text: str) -> str:
-    """Escape HTML characters"""
-    import html
-    return html.escape(text).replace('\n', '<br>')
+    """Escape HTML characters (markupsafe's C escaper), turning newlines into <br>"""
+    return str(escape(text)).replace('\n', '<br>')
+
 
+def record_snapshot(monitor: Monitor, raw_content: str, processed_content: str, change_count: int = 0, error_message: str = None, content_hash: Optional[bytes] = None, diff_html: Optional[str] = None) -> Snapshot:
+    """Record a new snapshot with proper hash calculation (new approach).
 
-def record_snapshot(monitor: Monitor, raw_content: str, processed_content: str, change_count: int = 0, error_message: str = None) -> Snapshot:
-    """Record a new snapshot with proper hash calculation (new approach)"""
-    content_hash = calculate_content_hash(processed_content, monitor.monitor_style, monitor.ignore_whitespace, monitor.ignore_case) if processed_content else None
+    Pass content_hash when the caller has already hashed processed_content.
+    The snapshot is only added to the session; the caller commits it together
+    with the monitor's own updates, so a check costs one commit.
+    """
+    if content_hash is None and processed_content:
+        # Already style-processed, so hash it directly rather than processing again
+        content_hash = hash_text(processed_content)
     
     snap = Snapshot(
         monitor=monitor, 
@@ -385,10 +524,12 @@ def record_snapshot(monitor: Monitor, raw_content: str, processed_content: str,
         content_text=processed_content,
         content_raw=raw_content,
         change_count=change_count,
+        diff_html=diff_html,
         error_message=error_message
     )
     db.session.add(snap)
-    db.session.commit()
+    # Kept alongside the insert so change detection never has to load the snapshot row
+    monitor.last_content_hash = content_hash
     return snap
 
 
@@ -396,41 +537,65 @@ def check_monitor(monitor: Monitor) -> Optional[Snapshot]:
     """Enhanced monitor checking with new approach"""
     try:
         # Fetch content
-        raw_content, text_content = fetch_text(monitor.url, monitor.css_selector, monitor.custom_headers)
-        
-        # Apply filters
-        filtered_content = apply_filters(text_content, monitor)
-        
-        # Process based on monitoring style
-        processed_content = process_content_by_style(
-            filtered_content, 
-            monitor.monitor_style, 
-            monitor.ignore_whitespace, 
-            monitor.ignore_case
+        resp = fetch_page(monitor.url, monitor.headers_dict)
+        raw_content = resp.text
+        raw_hash = page_fingerprint(
+            resp.content, resp.encoding, monitor.css_selector, monitor.ignore_text, monitor.trigger_text,
+            monitor.monitor_style, monitor.ignore_whitespace, monitor.ignore_case
         )
         
-        # Get last snapshot for comparison
-        last = (
-            Snapshot.query.filter_by(monitor_id=monitor.id)
-            .order_by(Snapshot.created_at.desc())
-            .first()
-        )
+        processed_content = None
+        if raw_hash == monitor.last_raw_hash:
+            # Same bytes under the same settings: reuse the stored text instead of reparsing
+            processed_content = (
+                db.session.query(Snapshot.content_text)
+                .filter_by(monitor_id=monitor.id)
+                .order_by(Snapshot.created_at.desc())
+                .limit(1)
+                .scalar()
+            )
         
-        # Update monitor timestamp
-        monitor.last_checked = db.func.now()
+        if processed_content is None:
+            # Apply filters
+            filtered_content = apply_filters(extract_text(resp.content, monitor.css_selector, resp.encoding), monitor)
+            
+            # Process based on monitoring style
+            processed_content = process_content_by_style(
+                filtered_content, 
+                monitor.monitor_style, 
+                monitor.ignore_whitespace, 
+                monitor.ignore_case
+            )
+        monitor.last_raw_hash = raw_hash
+        
+        # Update monitor timestamp and schedule the next check
+        monitor.mark_checked()
         
-        # Calculate MD5 hash for change detection (new approach)
-        current_hash = calculate_content_hash(processed_content, monitor.monitor_style, monitor.ignore_whitespace, monitor.ignore_case)
+        # Calculate content hash for change detection (new approach)
+        # (processed_content is already style-normalized; processing is idempotent)
+        current_hash = hash_text(processed_content)
         
-        # Check for changes using MD5 comparison
-        has_changed = not last or (last.content_hash != current_hash and processed_content)
+        # Compare against the newest snapshot's hash, denormalized onto the monitor row
+        last_hash = monitor.last_content_hash
+        has_changed = last_hash != current_hash and processed_content
         
         change_count = 0
         diff_html = ""
         
-        if has_changed and last and last.content_text:
-            # Calculate detailed diff only when MD5 hashes don't match (new approach)
-            diff_html, change_count = compute_diff(last.content_text, processed_content, monitor.monitor_style)
+        # Only a real change needs the previous text (an error snapshot has neither hash nor text)
+        last_text = None
+        if has_changed and last_hash is not None:
+            last_text = (
+                db.session.query(Snapshot.content_text)
+                .filter_by(monitor_id=monitor.id)
+                .order_by(Snapshot.created_at.desc())
+                .limit(1)
+                .scalar()
+            )
+        
+        if last_text:
+            # Calculate detailed diff only when hashes don't match (new approach)
+            diff_html, change_count = compute_diff(last_text, processed_content, monitor.monitor_style)
             
             # Apply trigger threshold check
             if change_count < monitor.trigger_threshold:
@@ -440,24 +605,65 @@ def check_monitor(monitor: Monitor) -> Optional[Snapshot]:
                 diff_html = ""
         
         # Always create a snapshot for monitoring history
-        snap = record_snapshot(monitor, raw_content, processed_content, change_count)
-        snap.content_hash = current_hash
-        
-        # Store the diff in the snapshot if there were significant changes
-        if has_changed and diff_html:
-            snap.diff_html = diff_html
-        
+        # (with the diff stored if there were significant changes)
+        snap = record_snapshot(
+            monitor, raw_content, processed_content, change_count,
+            content_hash=current_hash, diff_html=diff_html or None
+        )
         db.session.commit()
         return snap
         
     except Exception as e:
         # Handle errors
-        monitor.last_checked = db.func.now()
+        monitor.mark_checked()
+        monitor.last_raw_hash = None
         error_snap = record_snapshot(monitor, "", "", 0, str(e))
         db.session.commit()
         return error_snap
 
 
+def check_monitor_by_id(app, monitor_id: int) -> Optional[Snapshot]:
+    """Check a monitor inside its own app context so it can run on a worker thread.
+
+    Returns None without checking if the same monitor is already being checked.
+    """
+    with _IN_FLIGHT_LOCK:
+        if monitor_id in _IN_FLIGHT:
+            return None
+        _IN_FLIGHT.add(monitor_id)
+    try:
+        return _check_monitor_by_id(app, monitor_id)
+    finally:
+        with _IN_FLIGHT_LOCK:
+            _IN_FLIGHT.discard(monitor_id)
+
+
+def _check_monitor_by_id(app, monitor_id: int) -> Optional[Snapshot]:
+    with app.app_context():
+        monitor = db.session.get(Monitor, monitor_id)
+        if monitor is None:
+            return None
+        return check_monitor(monitor)
+
+
+def check_monitors_concurrently(app, monitor_ids: list[int], max_workers: int = 16) -> list[tuple[int, Exception]]:
+    """Check many monitors in parallel, overlapping their HTTP round-trips.
+
+    Returns (monitor_id, exception) pairs for the checks that raised.
+    """
+    failures = []
+    if not monitor_ids:
+        return failures
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(monitor_ids))) as executor:
+        futures = {executor.submit(check_monitor_by_id, app, mid): mid for mid in monitor_ids}
+        for future in as_completed(futures):
+            error = future.exception()
+            if error is not None:
+                failures.append((futures[future], error))
+    return failures
+
+
 def get_previous_snapshot(monitor_id: int, snapshot_id: int) -> Optional[Snapshot]:
     return (
         Snapshot.query.filter(
@@ -468,38 +674,52 @@ def get_previous_snapshot(monitor_id: int, snapshot_id: int) -> Optional[Snapsho
     )
 
 
-def get_snapshots_by_date_range(monitor_id: int, start_date: str, end_date: str) -> list[Snapshot]:
-    """Get snapshots within a date range for comparison"""
-    from datetime import datetime
-    
+@lru_cache(maxsize=1024)
+def parse_iso_date(value: str) -> datetime:
+    """Parse an ISO date/datetime from a form or query string (cached; dashboards repeat them)"""
     try:
-        start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-        end_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-    except:
+        # Accepts a trailing 'Z' as UTC on Python 3.11+
+        return datetime.fromisoformat(value)
+    except ValueError:
         # Fallback to simple date parsing
-        start_dt = datetime.strptime(start_date.split('T')[0], '%Y-%m-%d')
-        end_dt = datetime.strptime(end_date.split('T')[0], '%Y-%m-%d')
-    
+        return datetime.strptime(value.split('T')[0], '%Y-%m-%d')
+
+
+def _snapshot_range_query(monitor_id: int, start_date: str, end_date: str):
+    start_dt = parse_iso_date(start_date)
+    end_dt = parse_iso_date(end_date)
+    return Snapshot.query.filter(
+        Snapshot.monitor_id == monitor_id,
+        Snapshot.created_at >= start_dt,
+        Snapshot.created_at <= end_dt,
+        Snapshot.error_message.is_(None)  # Only include successful snapshots
+    )
+
+
+def get_snapshots_by_date_range(monitor_id: int, start_date: str, end_date: str) -> list[Snapshot]:
+    """Get snapshots within a date range for comparison"""
     return (
-        Snapshot.query.filter(
-            Snapshot.monitor_id == monitor_id,
-            Snapshot.created_at >= start_dt,
-            Snapshot.created_at <= end_dt,
-            Snapshot.error_message.is_(None)  # Only include successful snapshots
-        )
+        _snapshot_range_query(monitor_id, start_date, end_date)
         .order_by(Snapshot.created_at.asc())
         .all()
     )
 
 
+def get_snapshot_range_bounds(monitor_id: int, start_date: str, end_date: str) -> tuple[int, Optional[Snapshot], Optional[Snapshot]]:
+    """Get (count, first, last) for a date range without loading every snapshot in it"""
+    base = _snapshot_range_query(monitor_id, start_date, end_date)
+    total = base.with_entities(db.func.count(Snapshot.id)).scalar()
+    if total < 2:
+        return total, None, None
+    
+    first = base.order_by(Snapshot.created_at.asc()).first()
+    last = base.order_by(Snapshot.created_at.desc()).first()
+    return total, first, last
+
+
 def get_snapshot_by_date(monitor_id: int, target_date: str) -> Optional[Snapshot]:
     """Get the closest snapshot to a specific date"""
-    from datetime import datetime
-    
-    try:
-        target_dt = datetime.fromisoformat(target_date.replace('Z', '+00:00'))
-    except:
-        target_dt = datetime.strptime(target_date.split('T')[0], '%Y-%m-%d')
+    target_dt = parse_iso_date(target_date)
     
     # Find the closest snapshot to the target date
     return (
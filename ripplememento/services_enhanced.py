@@ -1,59 +1,91 @@
 import hashlib
-import json
+import re
+import threading
 import time
+import uuid
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
 from typing import Optional, Dict, Any
 import requests
 from bs4 import BeautifulSoup
-from diff_match_patch import diff_match_patch
 from .models_enhanced import Monitor, Snapshot, MonitorHistory
 from .extensions import db
+from .services import HTTP_SESSION, get_dmp, page_fingerprint
 from .notifications import notification_service, log_monitor_event
 
 
+# Manual checks run here so the request returns before the target site answers
+_CHECK_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="monitor-check")
+_CHECK_JOBS: "OrderedDict[str, Future]" = OrderedDict()
+_CHECK_JOBS_LOCK = threading.Lock()
+MAX_TRACKED_CHECK_JOBS = 1000
+# Latest job id per monitor, so a monitor never has two checks queued at once
+_MONITOR_CHECK_JOBS: Dict[int, str] = {}
+
 USER_AGENT = (
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
     "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125 Safari/537.36"
 )
 
+# Non-content elements, cut from the raw markup so the parser never builds them
+NON_CONTENT_ELEMENTS = re.compile(rb'<(script|style|noscript)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+
 
-def fetch_text(url: str, css_selector: Optional[str] = None, custom_headers: Optional[Dict[str, str]] = None) -> tuple[str, int, int]:
-    """Fetch text content from URL and return (text, status_code, response_time_ms)"""
+def fetch_page(url: str, custom_headers: Optional[Dict[str, str]] = None) -> tuple[requests.Response, int]:
+    """Fetch a page and return (response, response_time_ms)"""
     headers = {"User-Agent": USER_AGENT}
     if custom_headers:
         headers.update(custom_headers)
     
     start_time = time.time()
-    try:
-        resp = requests.get(url, headers=headers, timeout=30)
-        response_time_ms = int((time.time() - start_time) * 1000)
-        resp.raise_for_status()
-        
-        soup = BeautifulSoup(resp.text, "html.parser")
-        
-        if css_selector:
-            node = soup.select_one(css_selector)
-            text = node.get_text("\n", strip=True) if node else ""
-        else:
-            # Remove script, style, and other non-content elements
-            for s in soup(["script", "style", "noscript", "meta", "link"]):
-                s.decompose()
-            text = soup.get_text("\n", strip=True)
-        
-        return text, resp.status_code, response_time_ms
-    except Exception as e:
-        response_time_ms = int((time.time() - start_time) * 1000)
-        raise e
+    resp = HTTP_SESSION.get(url, headers=headers, timeout=30)
+    response_time_ms = int((time.time() - start_time) * 1000)
+    resp.raise_for_status()
+    return resp, response_time_ms
+
+
+def extract_text(content: bytes, css_selector: Optional[str] = None, encoding: Optional[str] = None) -> str:
+    """Visible text of a page, or of the first element matching css_selector.
+
+    encoding is the charset from the HTTP headers (resp.encoding), which the
+    parser would otherwise ignore when sniffing the raw bytes.
+    """
+    if css_selector:
+        soup = BeautifulSoup(content, "lxml", from_encoding=encoding)
+        node = soup.select_one(css_selector)
+        return node.get_text("\n", strip=True) if node else ""
+    # Script, style and noscript are cut before parsing; meta and link
+    # are void elements with no text, so get_text already skips them
+    soup = BeautifulSoup(NON_CONTENT_ELEMENTS.sub(b"", content), "lxml", from_encoding=encoding)
+    return soup.get_text("\n", strip=True)
+
+
+def ignore_regex(patterns) -> Optional[re.Pattern]:
+    """Compile ignore patterns into one literal alternation (None if there are none).
+
+    Longest patterns come first so a pattern wins over its own prefixes.
+    """
+    if not patterns:
+        return None
+    return re.compile("|".join(re.escape(p) for p in sorted(patterns, key=len, reverse=True)))
+
+
+@lru_cache(maxsize=500)
+def filter_patterns(ignore_text: Optional[str], trigger_text: Optional[str]) -> tuple[Optional[re.Pattern], tuple[str, ...]]:
+    """Ignore regex and trigger patterns, built once per distinct setting"""
+    ignore_patterns = {p.strip() for p in (ignore_text or "").split('\n') if p.strip()}
+    trigger_patterns = tuple(p.strip() for p in (trigger_text or "").split('\n') if p.strip())
+    return ignore_regex(ignore_patterns), trigger_patterns
 
 
 def apply_filters(text: str, monitor: Monitor) -> str:
     """Apply ignore/trigger text filters"""
-    if monitor.ignore_text:
-        ignore_patterns = [p.strip() for p in monitor.ignore_text.split('\n') if p.strip()]
-        for pattern in ignore_patterns:
-            text = text.replace(pattern, '')
+    ignore_pattern, trigger_patterns = filter_patterns(monitor.ignore_text, monitor.trigger_text)
+    if ignore_pattern is not None:
+        text = ignore_pattern.sub('', text)
     
-    if monitor.trigger_text:
-        trigger_patterns = [p.strip() for p in monitor.trigger_text.split('\n') if p.strip()]
+    if trigger_patterns:
         # Only return text if it contains any trigger pattern
         if not any(pattern in text for pattern in trigger_patterns):
             return ""
@@ -61,16 +93,64 @@ def apply_filters(text: str, monitor: Monitor) -> str:
     return text.strip()
 
 
-def hash_text(text: str) -> str:
-    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+def hash_text(text: str) -> bytes:
+    # Change detection only, not security: 128-bit BLAKE2b is plenty and faster than SHA-256
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def diff_line_budget(prev: str, current: str) -> int:
+    """Largest line edit count worth rendering inline for these two texts"""
+    lines = max(prev.count("\n"), current.count("\n")) + 1
+    return min(2000, max(100, lines // 4))
 
 
-def compute_diff(prev: str, current: str) -> str:
-    """Generate HTML diff with better styling"""
-    dmp = diff_match_patch()
-    diffs = dmp.diff_main(prev, current)
-    dmp.diff_cleanupSemantic(diffs)
+def compute_diff(prev: str, current: str, max_d: Optional[int] = None) -> Optional[str]:
+    """Generate HTML diff with better styling.
+
+    Returns None when max_d is given and the texts need more than max_d line
+    insertions/deletions, without running the diff itself.
+    """
+    if prev == current:
+        # A plain string compare settles unchanged content without any diffing
+        return render_diff_html([(0, current)] if current else [])
     
+    # Pages mostly share their header and footer; peel off the identical
+    # leading/trailing lines so only the changed middle goes through Myers
+    prev_lines = prev.splitlines(keepends=True)
+    current_lines = current.splitlines(keepends=True)
+    limit = min(len(prev_lines), len(current_lines))
+    start = 0
+    while start < limit and prev_lines[start] == current_lines[start]:
+        start += 1
+    end = 0
+    while end < limit - start and prev_lines[-end - 1] == current_lines[-end - 1]:
+        end += 1
+    prefix = "".join(prev_lines[:start])
+    suffix = "".join(prev_lines[len(prev_lines) - end:])
+    prev = "".join(prev_lines[start:len(prev_lines) - end])
+    current = "".join(current_lines[start:len(current_lines) - end])
+
+    dmp = get_dmp()
+    # Diff whole lines: each distinct line is mapped to one character, so the
+    # Myers bisection runs over line tokens instead of every character
+    prev_chars, current_chars, line_array = dmp.diff_linesToChars(prev, current)
+    if max_d is not None:
+        # Each surplus copy of a line on either side costs its own insert or
+        # delete, so this count is a lower bound on the edit distance
+        prev_counts, current_counts = Counter(prev_chars), Counter(current_chars)
+        surplus = (prev_counts - current_counts) + (current_counts - prev_counts)
+        if sum(surplus.values()) > max_d:
+            return None
+    diffs = dmp.diff_main(prev_chars, current_chars, False)
+    dmp.diff_charsToLines(diffs, line_array)
+    if prefix:
+        diffs.insert(0, (0, prefix))
+    if suffix:
+        diffs.append((0, suffix))
+    return render_diff_html(diffs)
+
+
+def render_diff_html(diffs: list[tuple[int, str]]) -> str:
     html = []
     for op, data in diffs:
         if op == 0:  # Equal
@@ -90,9 +170,31 @@ def compute_diff(prev: str, current: str) -> str:
     return "".join(html)
 
 
-def record_snapshot(monitor: Monitor, text: str, status_code: int = 200, response_time_ms: int = 0, error_message: str = None) -> Snapshot:
-    """Record a new snapshot"""
-    h = hash_text(text) if text else None
+@lru_cache(maxsize=512)
+def cached_diff(prev_hash: bytes, current_hash: bytes) -> Optional[str]:
+    """compute_diff for two stored contents, memoized by their hashes.
+
+    Snapshot content never changes once written, so the rendered diff for a
+    pair of hashes is reusable; the texts are only fetched on a cache miss.
+    """
+    def text_for(content_hash: bytes) -> str:
+        return (
+            db.session.query(Snapshot.content_text)
+            .filter(Snapshot.content_hash == content_hash)
+            .limit(1)
+            .scalar()
+        ) or ""
+
+    prev, current = text_for(prev_hash), text_for(current_hash)
+    return compute_diff(prev, current, max_d=diff_line_budget(prev, current))
+
+
+def record_snapshot(monitor: Monitor, text: str, status_code: int = 200, response_time_ms: int = 0, error_message: str = None, content_hash: Optional[bytes] = None) -> Snapshot:
+    """Record a new snapshot (pass content_hash if text was already hashed).
+
+    The snapshot is only added to the session; the caller commits it.
+    """
+    h = content_hash if content_hash is not None else (hash_text(text) if text else None)
     snap = Snapshot(
         monitor=monitor,
         content_hash=h,
@@ -102,7 +204,8 @@ def record_snapshot(monitor: Monitor, text: str, status_code: int = 200, respons
         error_message=error_message
     )
     db.session.add(snap)
-    db.session.commit()
+    # Kept alongside the insert so change detection never has to load the snapshot row
+    monitor.last_content_hash = h
     return snap
 
 
@@ -111,63 +214,61 @@ def check_monitor(monitor: Monitor) -> Optional[Snapshot]:
     monitor.total_checks += 1
     
     try:
-        # Parse custom headers if provided
-        custom_headers = {}
-        if monitor.headers:
-            try:
-                custom_headers = json.loads(monitor.headers)
-            except:
-                pass
-        
         # Fetch content
-        text, status_code, response_time_ms = fetch_text(
-            monitor.url, 
-            monitor.css_selector, 
-            custom_headers
-        )
+        resp, response_time_ms = fetch_page(monitor.url, monitor.headers_dict)
+        status_code = resp.status_code
         
-        # Apply filters
-        filtered_text = apply_filters(text, monitor)
+        # No snapshot exists before the first check
+        first_check = monitor.last_checked is None
         
-        # Get last snapshot for comparison
-        last = (
-            Snapshot.query.filter_by(monitor_id=monitor.id)
-            .order_by(Snapshot.created_at.desc())
-            .first()
+        raw_hash = page_fingerprint(
+            resp.content, resp.encoding, monitor.css_selector, monitor.ignore_text, monitor.trigger_text
         )
+        if raw_hash == monitor.last_raw_hash:
+            # Same bytes under the same settings: nothing to parse, nothing changed
+            monitor.mark_checked()
+            monitor.consecutive_failures = 0
+            log_monitor_event(monitor.id, "check", "No change detected")
+            db.session.commit()
+            return None
+        monitor.last_raw_hash = raw_hash
+        
+        # Apply filters
+        filtered_text = apply_filters(extract_text(resp.content, monitor.css_selector, resp.encoding), monitor)
         
-        # Update monitor timestamps
-        monitor.last_checked = db.func.now()
+        # Update monitor timestamps and schedule the next check
+        monitor.mark_checked()
         monitor.consecutive_failures = 0
         
-        # Check for changes
+        # Check for changes against the newest snapshot's hash, kept on the monitor row
         h = hash_text(filtered_text) if filtered_text else None
-        has_changed = not last or (last.content_hash != h and filtered_text)
+        last_hash = monitor.last_content_hash
+        has_changed = first_check or (last_hash != h and filtered_text)
         
         if has_changed:
             monitor.last_changed = db.func.now()
             monitor.total_changes += 1
             
-            snap = record_snapshot(monitor, filtered_text, status_code, response_time_ms)
+            snap = record_snapshot(monitor, filtered_text, status_code, response_time_ms, content_hash=h)
             
-            # Log and notify
-            log_monitor_event(monitor.id, "change", f"Content changed (hash: {h[:12]})")
+            # Log, commit the whole check at once, then notify
+            log_monitor_event(monitor.id, "change", f"Content changed (hash: {h.hex()[:12]})")
+            db.session.commit()
             
             if monitor.notification_enabled:
                 notification_service.send_notification(monitor, snap, "change")
-            
-            db.session.commit()
             return snap
         else:
             # No change, just log the check
-            log_monitor_event(monitor.id, "check", f"No change detected")
+            log_monitor_event(monitor.id, "check", "No change detected")
             db.session.commit()
             return None
             
     except Exception as e:
         # Handle errors
         monitor.consecutive_failures += 1
-        monitor.last_checked = db.func.now()
+        monitor.mark_checked()
+        monitor.last_raw_hash = None
         
         error_snap = record_snapshot(
             monitor, 
@@ -178,14 +279,60 @@ def check_monitor(monitor: Monitor) -> Optional[Snapshot]:
         )
         
         log_monitor_event(monitor.id, "error", str(e))
+        db.session.commit()
         
         if monitor.notification_enabled and monitor.consecutive_failures == 1:
             notification_service.send_notification(monitor, error_snap, "error")
-        
-        db.session.commit()
         return error_snap
 
 
+def run_check_job(app, monitor_id: int) -> Dict[str, Any]:
+    """Check a monitor inside its own app context and summarize the outcome"""
+    with app.app_context():
+        monitor = db.session.get(Monitor, monitor_id)
+        if monitor is None:
+            return {"success": False, "changed": False, "error": "Monitor not found"}
+        result = check_monitor(monitor)
+        return {
+            "success": True,
+            "changed": bool(result and result.content_hash),
+            "error": result.error_message if result else None,
+        }
+
+
+def enqueue_check(app, monitor_id: int) -> str:
+    """Queue a background check of one monitor and return its job id.
+
+    While a check of the monitor is still pending, its job id is returned instead.
+    """
+    with _CHECK_JOBS_LOCK:
+        job_id = _MONITOR_CHECK_JOBS.get(monitor_id)
+        future = _CHECK_JOBS.get(job_id)
+        if future is not None and not future.done():
+            return job_id
+        
+        job_id = uuid.uuid4().hex
+        _CHECK_JOBS[job_id] = _CHECK_EXECUTOR.submit(run_check_job, app, monitor_id)
+        _MONITOR_CHECK_JOBS[monitor_id] = job_id
+        while len(_CHECK_JOBS) > MAX_TRACKED_CHECK_JOBS:
+            _CHECK_JOBS.popitem(last=False)
+    return job_id
+
+
+def check_job_status(job_id: str) -> Optional[Dict[str, Any]]:
+    """State of a queued check: pending, or done/failed with its result (None if unknown)"""
+    with _CHECK_JOBS_LOCK:
+        future = _CHECK_JOBS.get(job_id)
+    if future is None:
+        return None
+    if not future.done():
+        return {"state": "pending"}
+    error = future.exception()
+    if error is not None:
+        return {"state": "failed", "success": False, "error": str(error)}
+    return {"state": "done", **future.result()}
+
+
 def get_previous_snapshot(monitor_id: int, snapshot_id: int) -> Optional[Snapshot]:
     return (
         Snapshot.query.filter(
@@ -198,23 +345,36 @@ def get_previous_snapshot(monitor_id: int, snapshot_id: int) -> Optional[Snapsho
 
 def get_monitor_stats(monitor_id: int) -> Dict[str, Any]:
     """Get comprehensive stats for a monitor"""
-    monitor = Monitor.query.get(monitor_id)
+    monitor = db.session.get(Monitor, monitor_id)
     if not monitor:
         return {}
     
-    snapshots = Snapshot.query.filter_by(monitor_id=monitor_id).all()
-    changes = [s for s in snapshots if s.content_hash]
-    errors = [s for s in snapshots if s.error_message]
-    
-    response_times = [s.response_time_ms for s in snapshots if s.response_time_ms]
-    avg_response_time = sum(response_times) / len(response_times) if response_times else 0
+    # Aggregated by the database in one pass rather than loading every snapshot
+    has_error = db.and_(Snapshot.error_message.isnot(None), Snapshot.error_message != "")
+    total_snapshots, total_changes, total_errors, avg_response_time = (
+        db.session.query(
+            db.func.count(Snapshot.id),
+            db.func.count(Snapshot.content_hash),
+            db.func.coalesce(db.func.sum(db.case((has_error, 1), else_=0)), 0),
+            db.func.avg(db.func.nullif(Snapshot.response_time_ms, 0)),
+        )
+        .filter(Snapshot.monitor_id == monitor_id)
+        .one()
+    )
+    last_error = (
+        db.session.query(Snapshot.error_message)
+        .filter(Snapshot.monitor_id == monitor_id, has_error)
+        .order_by(Snapshot.id.desc())
+        .limit(1)
+        .scalar()
+    )
     
     return {
-        "total_snapshots": len(snapshots),
-        "total_changes": len(changes),
-        "total_errors": len(errors),
-        "avg_response_time_ms": int(avg_response_time),
-        "uptime_percentage": ((monitor.total_checks - len(errors)) / monitor.total_checks * 100) if monitor.total_checks > 0 else 100,
-        "last_error": errors[-1].error_message if errors else None,
+        "total_snapshots": total_snapshots,
+        "total_changes": total_changes,
+        "total_errors": total_errors,
+        "avg_response_time_ms": int(avg_response_time or 0),
+        "uptime_percentage": ((monitor.total_checks - total_errors) / monitor.total_checks * 100) if monitor.total_checks > 0 else 100,
+        "last_error": last_error,
         "status": monitor.status
     }
\ No newline at end of file
@@ -1,40 +1,152 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 from apscheduler.schedulers.background import BackgroundScheduler
-from flask import current_app
-from .extensions import db
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, every process runs its own scheduler
+    fcntl = None
+from .extensions import db, optimize_sqlite, sqlite_data_version
 from .models import Monitor
-from .services import check_monitor
+from .services import check_monitor_by_id
 
 
 scheduler = BackgroundScheduler()
 
+# Monitors checked at least this often get their own pool, so a backlog of
+# slow long-interval checks can never hold up the frequent ones
+SHORT_INTERVAL_MINUTES = 5
+CHECK_POOLS: dict[str, ThreadPoolExecutor] = {}
+
+# Monitors submitted to a pool whose check has not finished yet; a monitor
+# stays due until its check lands, so later ticks must not submit it again
+_QUEUED: set[int] = set()
+_QUEUED_LOCK = threading.Lock()
+
+# Open for the life of the process once this process holds the scheduler lock
+_leader_lock_file = None
+
+
+# Outcomes of checks finished since the last tick, reported by that tick as
+# one summary line so an outage does not log a traceback per monitor
+_completed = 0
+_failures: list[tuple[int, str, str]] = []
+
+
+def _check_done(app, monitor_id: int, future):
+    global _completed
+    error = future.exception()
+    with _QUEUED_LOCK:
+        _QUEUED.discard(monitor_id)
+        _completed += 1
+        if error is not None:
+            _failures.append((monitor_id, type(error).__name__, str(error)))
+    if error is not None:
+        app.logger.debug("Scheduled check failed for %s", monitor_id, exc_info=error)
+
+
+def _log_check_summary(logger):
+    global _completed, _failures
+    with _QUEUED_LOCK:
+        completed, failures = _completed, _failures
+        _completed, _failures = 0, []
+    if failures:
+        logger.warning(
+            "Scheduled checks since last tick: %d ok, %d failed: %s",
+            completed - len(failures), len(failures), failures[:10],
+        )
+
+
+def acquire_scheduler_lock(app) -> bool:
+    """Try to become the one process on this host that runs the scheduler.
+
+    Multi-worker servers (and the debug reloader) create the app in several
+    processes; an exclusive flock on a file in the instance folder lets only
+    the first of them schedule checks. The lock is released when the
+    process exits.
+    """
+    global _leader_lock_file
+    if _leader_lock_file is not None or fcntl is None:
+        return True
+    os.makedirs(app.instance_path, exist_ok=True)
+    lock_file = open(os.path.join(app.instance_path, "scheduler.lock"), "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    _leader_lock_file = lock_file
+    return True
+
 
 def init_scheduler(app):
     if scheduler.state == 0:
+        if not acquire_scheduler_lock(app):
+            app.logger.info("Scheduler already running in another process; not starting one here")
+            return scheduler
         scheduler.configure(timezone="UTC")
         scheduler.start()
+    
+    if not CHECK_POOLS:
+        # Checks are mostly network waits; MONITOR_WORKERS is split between the pools
+        workers = app.config.get("MONITOR_WORKERS", 16)
+        CHECK_POOLS["short"] = ThreadPoolExecutor(max(1, workers // 2), thread_name_prefix="check-short")
+        CHECK_POOLS["long"] = ThreadPoolExecutor(max(1, workers - workers // 2), thread_name_prefix="check-long")
 
-    def tick_all():
+    # Keep SQLite's planner statistics fresh for long-running processes
+    @scheduler.scheduled_job("interval", hours=6, id="ripplememento-optimize", coalesce=True)
+    def optimize_database():
         with app.app_context():
-            for m in Monitor.query.filter_by(active=True).all():
-                try:
-                    check_monitor(m)
-                except Exception as e:
-                    app.logger.exception("Error checking monitor %s: %s", m.id, e)
+            if db.engine.dialect.name == "sqlite":
+                optimize_sqlite(db.engine)
+
+    # (data_version, earliest next_check_at) from the last tick that found
+    # nothing due: until another commit lands or that time passes, the
+    # monitor table cannot have anything due and the tick skips its query
+    idle = None
 
     # Global job to iterate monitors every minute and dispatch checks by interval
-    @scheduler.scheduled_job("interval", minutes=1, id="ripplememento-global")
+    # After a stall, missed ticks collapse into one run instead of firing back to back
+    @scheduler.scheduled_job(
+        "interval", minutes=1, id="ripplememento-global",
+        coalesce=True, max_instances=1, misfire_grace_time=30, jitter=10,
+    )
     def scheduled_tick():
+        nonlocal idle
+        _log_check_summary(app.logger)
+        now = datetime.utcnow()
         with app.app_context():
-            now = datetime.utcnow()
-            for m in Monitor.query.filter_by(active=True).all():
-                due = not m.last_checked or (
-                    (now - m.last_checked).total_seconds() >= m.interval_minutes * 60
-                )
-                if due:
-                    try:
-                        check_monitor(m)
-                    except Exception:
-                        current_app.logger.exception("Scheduled check failed for %s", m.id)
+            version = sqlite_data_version()
+            if idle is not None and idle[0] == version and now < idle[1]:
+                return
+            
+            active = Monitor.active.is_(True)
+            # Only due monitors (rides ix_monitor_active_next_check), most overdue
+            # first (never-checked NULLs sort ahead), capped so a backlog drains
+            # over several ticks instead of flooding the pools at once
+            due = db.session.execute(
+                db.select(Monitor.id, Monitor.interval_minutes)
+                .where(active, db.or_(Monitor.next_check_at.is_(None), Monitor.next_check_at <= now))
+                .order_by(Monitor.next_check_at)
+                .limit(app.config.get("MAX_CHECKS_PER_TICK", 500))
+            ).all()
+            
+            idle = None
+            if not due and version is not None:
+                earliest = db.session.scalar(db.select(db.func.min(Monitor.next_check_at)).where(active))
+                idle = (version, earliest or datetime.max)
+        
+        # Hand the checks to the pools and return; each worker loads its
+        # monitor in its own app context
+        for monitor_id, interval_minutes in due:
+            with _QUEUED_LOCK:
+                if monitor_id in _QUEUED:
+                    continue
+                _QUEUED.add(monitor_id)
+            pool = CHECK_POOLS["short" if (interval_minutes or 30) <= SHORT_INTERVAL_MINUTES else "long"]
+            future = pool.submit(check_monitor_by_id, app, monitor_id)
+            future.add_done_callback(partial(_check_done, app, monitor_id))
 
     return scheduler